@@ -0,0 +1,4 @@
+# --- PROJECT AXIOGEN: SHARED CORE ---
+# Infrastructure shared by every stage script (runtime flags, simulation
+# kernels, logging). Stage scripts put the repo root on sys.path and import
+# the modules they need, e.g. `from axiocore import runtime`.
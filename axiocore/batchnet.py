@@ -0,0 +1,152 @@
+import numpy as np
+import neat
+from neat.graphs import feed_forward_layers
+
+# --- PROJECT AXIOGEN: BATCHED POPULATION INFERENCE ---
+# A generation of NEAT genomes compiled into padded tensors, one block per
+# topological depth. Every genome gets the same node-value layout:
+#
+#   [ inputs | outputs | hidden ... | ZERO | TRASH ]
+#
+# and each layer block stores, per genome and per node, the slots it reads
+# (src), their weights, where the result goes (dst), bias and response.
+# Padding reads the ZERO slot with weight 0 and writes to the TRASH slot, so
+# genomes of any size share one evaluation. activate() runs all live agents
+# through all layers as (N, ...) array ops and returns (N, num_outputs), the
+# same values neat.nn.FeedForwardNetwork.activate returns for each genome.
+# Weighted inputs are summed in the same order as neat. The fast activations
+# use np.tanh, which can disagree with math.tanh in the last bit (~1e-16);
+# exact=True applies neat's own activation functions element-wise instead and
+# is bit-identical to FeedForwardNetwork (slower, but still one call).
+
+ACTIVATIONS = {
+    'tanh': lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    'sigmoid': lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    'relu': lambda z: np.where(z > 0.0, z, 0.0),
+    'identity': lambda z: z,
+}
+
+class Layer:
+    def __init__(self, g, m, k, zero, trash):
+        self.dst = np.full((g, m), trash, dtype=np.intp)
+        self.src = np.full((g, m, k), zero, dtype=np.intp)
+        self.weight = np.zeros((g, m, k))
+        self.bias = np.zeros((g, m))
+        self.response = np.zeros((g, m))
+        self.act = np.zeros((g, m), dtype=np.intp)
+
+def exact_activation(func):
+    ufunc = np.frompyfunc(func, 1, 1)
+    return lambda z: ufunc(z).astype(float)
+
+class BatchNetwork:
+    def __init__(self, genomes, config, exact=False):
+        gc = config.genome_config
+        self.input_keys, self.output_keys = list(gc.input_keys), list(gc.output_keys)
+        self.num_inputs, self.num_outputs = len(self.input_keys), len(self.output_keys)
+        self.exact = exact
+        self.act_names = []
+        self.act_funcs = []
+
+        # Walk each genome exactly like FeedForwardNetwork.create does
+        plans = [self._plan(genome, config) for genome in genomes]
+        max_hidden = max((len(p[0]) - self.num_inputs - self.num_outputs for p in plans), default=0)
+        self.width = self.num_inputs + self.num_outputs + max_hidden + 2
+        self.zero, self.trash = self.width - 2, self.width - 1
+
+        depth = max((len(p[1]) for p in plans), default=0)
+        self.layers = []
+        for l in range(depth):
+            rows = [p[1][l] if l < len(p[1]) else [] for p in plans]
+            m = max(len(r) for r in rows)
+            k = max((len(node[1]) for r in rows for node in r), default=0)
+            layer = Layer(len(plans), m, k, self.zero, self.trash)
+            for g, (slots, _) in enumerate(plans):
+                for j, (node, links, bias, response, act) in enumerate(rows[g]):
+                    layer.dst[g, j] = slots[node]
+                    layer.bias[g, j] = bias
+                    layer.response[g, j] = response
+                    layer.act[g, j] = act
+                    for c, (inode, w) in enumerate(links):
+                        layer.src[g, j, c] = slots[inode]
+                        layer.weight[g, j, c] = w
+            self.layers.append(layer)
+
+    def _plan(self, genome, config):
+        gc = config.genome_config
+        connections = [cg.key for cg in genome.connections.values() if cg.enabled]
+        layers = feed_forward_layers(self.input_keys, self.output_keys, connections)
+
+        slots = {key: i for i, key in enumerate(self.input_keys + self.output_keys)}
+        planned = []
+        for layer in layers:
+            nodes = []
+            for node in sorted(layer):
+                if node not in slots: slots[node] = len(slots)
+                links = [(i, genome.connections[(i, o)].weight) for i, o in connections if o == node]
+                ng = genome.nodes[node]
+                if ng.aggregation != 'sum':
+                    raise ValueError(f"BatchNetwork only supports sum aggregation (node {node}: {ng.aggregation})")
+                if ng.activation not in self.act_names:
+                    if self.exact:
+                        self.act_funcs.append(exact_activation(gc.activation_defs.get(ng.activation)))
+                    elif ng.activation in ACTIVATIONS:
+                        self.act_funcs.append(ACTIVATIONS[ng.activation])
+                    else:
+                        raise ValueError(f"BatchNetwork has no fast '{ng.activation}' activation (node {node}), use exact=True")
+                    self.act_names.append(ng.activation)
+                nodes.append((node, links, ng.bias, ng.response, self.act_names.index(ng.activation)))
+            planned.append(nodes)
+        return slots, planned
+
+    def activate(self, inputs, rows=None):
+        """
+        inputs: (N, num_inputs), one row per agent. rows: the genome index of
+        each agent (default: agent i runs genome i). Returns (N, num_outputs).
+        """
+        inputs = np.asarray(inputs, dtype=float).reshape(-1, self.num_inputs)
+        n = len(inputs)
+        rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.intp)
+        values = np.zeros((n, self.width))
+        values[:, :self.num_inputs] = inputs
+        agent = np.arange(n)[:, None]
+
+        for layer in self.layers:
+            src, weight = layer.src[rows], layer.weight[rows]
+            picked = values[agent[:, :, None], src]   # (N, M, K)
+            # Accumulate link by link: same summation order as sum() in neat
+            s = picked[:, :, 0] * weight[:, :, 0] if src.shape[2] else np.zeros(src.shape[:2])
+            for c in range(1, src.shape[2]):
+                s = s + picked[:, :, c] * weight[:, :, c]
+            z = layer.bias[rows] + layer.response[rows] * s
+            if len(self.act_funcs) == 1:
+                out = self.act_funcs[0](z)
+            else:
+                act = layer.act[rows]
+                out = np.zeros_like(z)
+                for code, func in enumerate(self.act_funcs):
+                    out = np.where(act == code, func(z), out)
+            values[agent, layer.dst[rows]] = out
+
+        return values[:, self.num_inputs:self.num_inputs + self.num_outputs]
+
+class NeatNetworks:
+    """ Per-genome neat FeedForwardNetworks behind the BatchNetwork interface. """
+    def __init__(self, genomes, config):
+        self.nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome in genomes]
+        self.num_outputs = config.genome_config.num_outputs
+
+    def activate(self, inputs, rows=None):
+        inputs = np.asarray(inputs, dtype=float).tolist()
+        if rows is None: rows = range(len(inputs))
+        outputs = [self.nets[r].activate(x) for r, x in zip(rows, inputs)]
+        return np.array(outputs, dtype=float).reshape(-1, self.num_outputs)
+
+def compile_population(genomes, config, backend='neat'):
+    """
+    backend: 'neat' = one FeedForwardNetwork per genome, 'batch' = BatchNetwork,
+    'batch-exact' = BatchNetwork with neat's own (bit-identical) activations.
+    """
+    if backend == 'batch': return BatchNetwork(genomes, config)
+    if backend == 'batch-exact': return BatchNetwork(genomes, config, exact=True)
+    return NeatNetworks(genomes, config)
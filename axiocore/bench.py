@@ -0,0 +1,241 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import neat
+import numpy as np
+
+from axiocore import runtime, spatial, raycast, profiling
+
+# --- PROJECT AXIOGEN: BENCHMARKS ---
+# Agent-steps per second (one agent sensing, thinking and moving for one
+# frame) for every world: Stage 1 foraging, the Stage 2 maze, the Stage 3/4
+# key-gate world and the three University planets. Each case runs headless
+# from a fixed seed with a fresh population of random genomes, swept over
+# population size, food / extra wall counts, --engine and --inference, and
+# keeps the best of --repeat runs.
+#
+#   python -m axiocore.bench run --out baseline.json
+#   python -m axiocore.bench compare baseline.json current.json --threshold 0.1
+#
+# compare flags every case whose throughput dropped by more than the
+# threshold and exits with status 1, so it can gate a CI job. Baselines are
+# only comparable on the same machine.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {
+    'stage1': 'stage1/axiogen_evo_stage1.py',
+    'stage2': 'stage2/axiogen_stage2.py',
+    'stage3': 'stage3/stage_3.py',
+    'stage4': 'stage4/stage4.py',
+    'university': 'final_test/test.py',
+}
+PLANETS = {'harvester': 0, 'snake': 1, 'hunter': 2}
+WORLDS = ('stage1', 'stage2', 'stage3', 'stage4', *PLANETS)
+UNIVERSITY_FRAMES = 1500
+
+_modules = {}
+
+def script(name):
+    """ A stage script (or the University) imported by path, once. """
+    if name not in _modules:
+        path = os.path.join(ROOT, SCRIPTS[name])
+        spec = importlib.util.spec_from_file_location(f"axiogen_bench_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[name] = module
+    return _modules[name]
+
+def load_config(name, pop_size):
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                os.path.join(ROOT, os.path.dirname(SCRIPTS[name]), 'config-feedforward.txt'))
+    config.pop_size = pop_size
+    return config
+
+class StepCounter(profiling.NullTimer):
+    """ Stands in for the stage's timer: counts agent-steps, times nothing. """
+    def __init__(self):
+        self.agent_steps = 0
+
+    def end_frame(self, agents):
+        self.agent_steps += agents
+
+def cases(worlds=WORLDS, pops=(50, 200), foods=(40, 200), obstacles=(0, 30),
+          engines=('python', 'numpy'), inferences=('neat', 'batch')):
+    """ The sweep: one dict per case. Axes a world does not use are left out. """
+    for world in worlds:
+        axes = {'pop': pops}
+        if world in ('stage1', 'harvester'): axes['food'] = foods
+        if world in ('stage2', 'stage3', 'stage4', 'snake'): axes['obstacles'] = obstacles
+        if world.startswith('stage'): axes['engine'] = engines
+        for values in itertools.product(*axes.values()):
+            case = {'world': world, **dict(zip(axes, values))}
+            # Stage 1's python path and Stage 4's plastic nets do not use batchnet
+            if world in ('stage2', 'stage3') or (world == 'stage1' and case['engine'] == 'numpy'):
+                for inference in inferences:
+                    yield {**case, 'inference': inference}
+            else:
+                yield case
+
+def case_name(case):
+    return ' '.join([case['world']] + [f"{k}={v}" for k, v in case.items() if k != 'world'])
+
+def add_obstacles(world, count, seed):
+    """ count extra random walls (Stage 2 maze style), drawn from their own RNG. """
+    import pygame
+    rng = random.Random(seed)
+    extra = []
+    for _ in range(count):
+        x, y = rng.randint(100, 600), rng.randint(100, 400)
+        if rng.random() > 0.5: extra.append(pygame.Rect(x, y, rng.randint(60, 200), 20))
+        else: extra.append(pygame.Rect(x, y, 20, rng.randint(60, 200)))
+    world.walls.extend(extra)
+    if hasattr(world, 'gate_rect'): world.gated_walls = world.walls + [world.gate_rect] # Stages 3/4: the gate stays last
+    if hasattr(world, 'index_walls'): world.index_walls() # Stage 2: ray-cast arrays and broadphase grid
+    elif hasattr(world, 'wall_set'): world.wall_set = raycast.WallSet(getattr(world, 'gated_walls', world.walls))
+
+def build_world(case, seed):
+    name = case['world']
+    if name == 'stage1':
+        world = script(name).World(os.path.join(ROOT, 'stage1', 'world_alpha.xml'))
+        world.foods, world.food_index = [], spatial.SpatialHash(cell_size=50)
+        m = world.food_margin
+        for i in range(case['food']):
+            world.foods.append([random.randint(m, world.width - m), random.randint(m, world.height - m)])
+            world.food_index.insert(i, *world.foods[i])
+    elif name in PLANETS:
+        world = script('university').World(PLANETS[name])
+        if name == 'harvester':
+            world.foods, world.food_index = {}, spatial.SpatialHash(cell_size=50)
+            for i in range(case['food']):
+                world.foods[i] = [random.randint(50, 750), random.randint(50, 550)]
+                world.food_index.insert(i, *world.foods[i])
+    else:
+        world = script(name).World()
+    if case.get('obstacles'): add_obstacles(world, case['obstacles'], seed)
+    return world
+
+def run_case(case, seed=0):
+    """ One timed episode. Returns (agent-steps, seconds). """
+    name = case['world']
+    module = script('university' if name in PLANETS else name)
+    config = load_config('university' if name in PLANETS else name, case['pop'])
+    runtime.seed_everything(seed)
+    genomes = list(neat.Population(config).population.items())
+
+    if name in PLANETS:
+        # The exam is single-agent: pop independent exams, one per genome
+        worlds = [build_world(case, seed) for _ in genomes]
+        steps = 0
+        start = time.perf_counter()
+        for world, (_, genome) in zip(worlds, genomes):
+            agent = module.Agent(400, 500, genome, config)
+            frame = 0
+            while frame < UNIVERSITY_FRAMES and agent.alive:
+                world.update_hunter(frame)
+                agent.drive(world)
+                frame += 1
+            steps += frame
+        return steps, time.perf_counter() - start
+
+    module.options = runtime.defaults()
+    module.options.headless = True
+    module.options.engine = case['engine']
+    if 'inference' in case: module.options.inference = case['inference']
+    module.generation = 1
+    module.timer = counter = StepCounter()
+    world = build_world(case, seed)
+    simulate = module.simulate_swarm if name == 'stage1' and case['engine'] == 'numpy' else module.simulate
+    start = time.perf_counter()
+    simulate(genomes, config, world, False)
+    return counter.agent_steps, time.perf_counter() - start
+
+def measure(case, seed=0, repeat=3):
+    """ Best of repeat runs (same seed, so the same episode each time). """
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()): # KEY FOUND / GOAL REACHED chatter
+            steps, seconds = run_case(case, seed)
+        if best is None or seconds < best[1]: best = (steps, seconds)
+    steps, seconds = best
+    return {**case, 'agent_steps': steps, 'seconds': seconds, 'steps_per_s': steps / seconds if seconds else 0.0}
+
+def run(case_list, seed=0, repeat=3, out=None):
+    results = {}
+    for case in case_list:
+        result = measure(case, seed, repeat)
+        results[case_name(case)] = result
+        print(f"{case_name(case):<55} {result['steps_per_s']:>12,.0f} agent-steps/s")
+    report = {
+        'meta': {'seed': seed, 'repeat': repeat, 'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+                 'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'processor': platform.processor(), 'cpus': os.cpu_count()},
+        'results': results,
+    }
+    if out is not None:
+        with runtime.atomic_write(out) as f:
+            f.write(json.dumps(report, indent=2).encode('utf-8'))
+        print(f" >> Saved {len(results)} results to {out}")
+    return report
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Matches cases by name. Returns [(name, baseline steps/s, current steps/s,
+    ratio, regressed)]; a case regressed if it lost more than threshold.
+    """
+    rows = []
+    for name, base in baseline['results'].items():
+        if name not in current['results']: continue
+        new = current['results'][name]
+        ratio = new['steps_per_s'] / base['steps_per_s'] if base['steps_per_s'] else float('inf')
+        rows.append((name, base['steps_per_s'], new['steps_per_s'], ratio, ratio < 1 - threshold))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AXIOGEN simulation benchmarks (agent-steps per second).")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run_p = sub.add_parser('run', help="Run the sweep and optionally save it as a JSON baseline.")
+    run_p.add_argument('--worlds', nargs='+', choices=WORLDS, default=list(WORLDS))
+    run_p.add_argument('--pop', nargs='+', type=int, default=[50, 200], help="Population sizes.")
+    run_p.add_argument('--food', nargs='+', type=int, default=[40, 200], help="Food counts (Stage 1, Harvester).")
+    run_p.add_argument('--obstacles', nargs='+', type=int, default=[0, 30],
+                       help="Extra random walls (Stages 2-4, Snake).")
+    run_p.add_argument('--engine', nargs='+', choices=['python', 'numpy'], default=['python', 'numpy'])
+    run_p.add_argument('--inference', nargs='+', choices=['neat', 'batch', 'batch-exact'], default=['neat', 'batch'])
+    run_p.add_argument('--seed', type=int, default=0)
+    run_p.add_argument('--repeat', type=int, default=3, help="Runs per case; the fastest counts.")
+    run_p.add_argument('--out', default=None, help="Write the results to this JSON file.")
+    cmp_p = sub.add_parser('compare', help="Flag throughput regressions of CURRENT against BASELINE.")
+    cmp_p.add_argument('baseline')
+    cmp_p.add_argument('current')
+    cmp_p.add_argument('--threshold', type=float, default=0.1, help="Allowed slowdown (0.1 = 10%%).")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        run(cases(args.worlds, args.pop, args.food, args.obstacles, args.engine, args.inference),
+            args.seed, args.repeat, args.out)
+        return 0
+
+    with open(args.baseline) as f: baseline = json.load(f)
+    with open(args.current) as f: current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    for name, base, new, ratio, regressed in rows:
+        flag = "  << REGRESSION" if regressed else ""
+        print(f"{name:<55} {base:>12,.0f} -> {new:>12,.0f} ({ratio - 1:+.1%}){flag}")
+    missing = set(baseline['results']) ^ set(current['results'])
+    if missing: print(f" >> {len(missing)} case(s) only in one of the files (not compared).")
+    regressions = sum(row[4] for row in rows)
+    print(f" >> {regressions} regression(s) beyond {args.threshold:.0%} in {len(rows)} cases.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
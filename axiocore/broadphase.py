@@ -0,0 +1,61 @@
+import numpy as np
+
+# --- PROJECT AXIOGEN: WALL BROADPHASE ---
+# Uniform grid over the walls of a world. For every cell it lists (once, when
+# the world is built) the walls that a body or a ray of length `reach`
+# starting anywhere in that cell can touch, in wall order. A lookup is then
+# one cell index, and collision and ray tests only run against the walls
+# near the agent: the cost follows local wall density, not the size of the
+# maze. Since every wall that can be hit is listed, and in the original
+# order, results are identical to testing every wall (first hit included).
+#
+# Cells on the edge of the grid reach out to infinity, so agents that leave
+# the map are still covered by the nearest cell.
+#
+#   near(x, y)      (A, K) wall indices per agent for raycast / physics,
+#                   padded with len(walls) (the WallSet's padding wall)
+#   rects_near(x, y)  the wall objects themselves, for the per-agent loops
+
+class WallGrid:
+    def __init__(self, rects, reach, width, height, cell=50):
+        self.items = list(rects)
+        self.cell = cell
+        self.cols, self.rows = max(1, -(-width // cell)), max(1, -(-height // cell))
+        boxes = np.array([tuple(r) for r in self.items], dtype=np.int64).reshape(-1, 4)
+        x0, y0 = boxes[:, 0], boxes[:, 1]
+        x_end, y_end = x0 + boxes[:, 2], y0 + boxes[:, 3]
+
+        # Extent of what can be touched from each column / row of cells (+2: pixel truncation)
+        reach = reach + 2
+        lo_x = np.arange(self.cols) * cell - reach
+        hi_x = (np.arange(self.cols) + 1) * cell + reach
+        lo_y = np.arange(self.rows) * cell - reach
+        hi_y = (np.arange(self.rows) + 1) * cell + reach
+        lo_x, hi_x, lo_y, hi_y = (a.astype(float) for a in (lo_x, hi_x, lo_y, hi_y))
+        lo_x[0] = lo_y[0] = -np.inf
+        hi_x[-1] = hi_y[-1] = np.inf
+        in_col = (x0 < hi_x[:, None]) & (x_end > lo_x[:, None]) # (cols, W)
+        in_row = (y0 < hi_y[:, None]) & (y_end > lo_y[:, None]) # (rows, W)
+
+        self.lists = [np.flatnonzero(in_row[r] & in_col[c]) for r in range(self.rows) for c in range(self.cols)]
+        self.counts = np.array([len(ids) for ids in self.lists])
+        self.ids = np.full((len(self.lists), max(1, self.counts.max())), len(self.items), dtype=np.intp)
+        for i, ids in enumerate(self.lists): self.ids[i, :len(ids)] = ids
+        self.rect_lists = [[self.items[i] for i in ids.tolist()] for ids in self.lists]
+
+    def cells(self, x, y):
+        """ Flat cell index of every (x, y), clamped to the grid. """
+        cx = np.clip(np.floor_divide(np.asarray(x, dtype=float), self.cell), 0, self.cols - 1).astype(np.intp)
+        cy = np.clip(np.floor_divide(np.asarray(y, dtype=float), self.cell), 0, self.rows - 1).astype(np.intp)
+        return cy * self.cols + cx
+
+    def near(self, x, y):
+        """ (A, K) indices of the walls near each (x, y), padded with len(walls). """
+        cells = self.cells(x, y)
+        return self.ids[cells, :max(1, self.counts[cells].max(initial=0))]
+
+    def rects_near(self, x, y):
+        """ The walls near one point, in wall order. """
+        cx = min(max(int(x // self.cell), 0), self.cols - 1)
+        cy = min(max(int(y // self.cell), 0), self.rows - 1)
+        return self.rect_lists[cy * self.cols + cx]
@@ -0,0 +1,96 @@
+import gzip
+import itertools
+import pickle
+import random
+
+import neat
+import numpy as np
+
+from axiocore import runtime
+
+# --- PROJECT AXIOGEN: POPULATION CHECKPOINTS ---
+# Everything needed to continue a run exactly where it stopped: the current
+# population, the species set, the reproduction state (ancestors and the next
+# genome key), the next node key, the generation counter, the best genome so
+# far and both random streams, plus whatever stage state the stage hands in
+# as `extra` (Stage 2: its novelty archive). neat's own Checkpointer restarts the genome
+# counter at 1 on restore, so keys collide with the old population; this one
+# does not.
+#
+# Snapshots are pickled, gzip-compressed (level 1: cheap to write, still
+# several times smaller) and written to a temp file that is renamed over the
+# previous checkpoint, so a crash mid-write never loses the last good one.
+
+VERSION = 1
+
+def peek(counter):
+    """ Next value of an itertools.count, without losing it. Returns (value, fresh counter). """
+    value = next(counter)
+    return value, itertools.count(value)
+
+class Checkpointer(neat.reporting.BaseReporter):
+    """ Reporter that saves a checkpoint of the population every `interval` generations. """
+    def __init__(self, population, path, interval=10, extra=None):
+        self.population = population
+        self.path = path
+        self.interval = interval
+        self.extra = extra
+
+    def end_generation(self, config, population, species_set):
+        # neat bumps p.generation after the reporters ran
+        if self.interval and (self.population.generation + 1) % self.interval == 0:
+            save(self.population, self.path, self.population.generation + 1, self.extra)
+
+def save(p, path, generation=None, extra=None):
+    """ extra: optional callable returning a dict of stage state to save alongside. """
+    reproduction, species = p.reproduction, p.species
+    next_genome, reproduction.genome_indexer = peek(reproduction.genome_indexer)
+    next_species, species.indexer = peek(species.indexer)
+    next_node = None
+    gc = p.config.genome_config
+    if gc.node_indexer is not None:
+        next_node, gc.node_indexer = peek(gc.node_indexer)
+
+    state = {
+        'version': VERSION,
+        'generation': p.generation if generation is None else generation,
+        'population': p.population,
+        'species': species.species,
+        'genome_to_species': species.genome_to_species,
+        'next_species': next_species,
+        'ancestors': reproduction.ancestors,
+        'next_genome': next_genome,
+        'next_node': next_node,
+        'best_genome': p.best_genome,
+        'random': random.getstate(),
+        'numpy_random': np.random.get_state(),
+        'extra': extra() if extra is not None else {},
+    }
+    with runtime.atomic_write(path) as f:
+        with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=1) as z:
+            pickle.dump(state, z, protocol=pickle.HIGHEST_PROTOCOL)
+
+def restore(path, config, extra=None):
+    """
+    A neat.Population continuing from the checkpoint at path (RNG state
+    included). extra, if given, is called with the saved stage state dict.
+    """
+    with gzip.open(path, 'rb') as f:
+        state = pickle.load(f)
+    if state.get('version') != VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {state.get('version')}")
+
+    p = neat.Population(config, (state['population'], None, state['generation']))
+    p.species = config.species_set_type(config.species_set_config, p.reporters)
+    p.species.species = state['species']
+    p.species.genome_to_species = state['genome_to_species']
+    p.species.indexer = itertools.count(state['next_species'])
+    p.reproduction.ancestors = state['ancestors']
+    p.reproduction.genome_indexer = itertools.count(state['next_genome'])
+    if state['next_node'] is not None:
+        config.genome_config.node_indexer = itertools.count(state['next_node'])
+    p.best_genome = state['best_genome']
+    random.setstate(state['random'])
+    np.random.set_state(state['numpy_random'])
+    if extra is not None: extra(state.get('extra', {}))
+    return p
@@ -0,0 +1,51 @@
+import numpy as np
+
+# --- PROJECT AXIOGEN: COVERAGE GRID ---
+# Exploration bookkeeping for a whole population: one boolean array of shape
+# (agents, rows, cols), a cell per grid_size x grid_size pixels of the map
+# (30 x 40 for Stage 2's 800x600 maze on a 20px grid). visit() looks up and
+# marks every live agent's cell in one indexing step and returns which of
+# them were new, so the reward needs no per-agent set or tuple.
+#
+# Cells are floor(x / grid_size), as the old sets used. An agent pushed off
+# the map (a cell outside the grid) still counts: those rare cells go to a
+# small per-agent overflow set instead of being clipped to the border.
+
+class CoverageGrid:
+    def __init__(self, agents, width, height, grid_size=20):
+        self.grid_size = grid_size
+        self.rows, self.cols = -(-height // grid_size), -(-width // grid_size)
+        self.visited = np.zeros((agents, self.rows, self.cols), dtype=bool)
+        self.overflow = {} # agent -> {(sx, sy)} outside the grid
+
+    def visit(self, agents, x, y):
+        """ Marks the cells of agents (indices) at (x, y). Returns a bool array: True where the cell was new. """
+        agents = np.asarray(agents, dtype=np.intp)
+        sx = np.floor_divide(np.asarray(x, dtype=float), self.grid_size).astype(np.intp)
+        sy = np.floor_divide(np.asarray(y, dtype=float), self.grid_size).astype(np.intp)
+        inside = (sx >= 0) & (sx < self.cols) & (sy >= 0) & (sy < self.rows)
+        new = np.zeros(len(agents), dtype=bool)
+        a, r, c = agents[inside], sy[inside], sx[inside]
+        new[inside] = ~self.visited[a, r, c]
+        self.visited[a, r, c] = True
+        for k in np.flatnonzero(~inside).tolist():
+            cells = self.overflow.setdefault(int(agents[k]), set())
+            cell = (int(sx[k]), int(sy[k]))
+            new[k] = cell not in cells
+            cells.add(cell)
+        return new
+
+    def cells(self):
+        """ Cells visited per agent. """
+        counts = self.visited.sum(axis=(1, 2))
+        for agent, cells in self.overflow.items(): counts[agent] += len(cells)
+        return counts
+
+    def stats(self):
+        """ {column: value} for a metrics log: per-agent and population-wide coverage. """
+        counts = self.cells()
+        union = int(self.visited.any(axis=0).sum())
+        total = self.rows * self.cols
+        return {'cells': total, 'mean_cells': float(counts.mean()) if len(counts) else 0.0,
+                'max_cells': int(counts.max()) if len(counts) else 0,
+                'union_cells': union, 'union_fraction': union / total}
@@ -0,0 +1,91 @@
+import math
+
+import neat
+
+# --- PROJECT AXIOGEN: EARLY TERMINATION ---
+# Agents that are stuck spinning in a corner or pinned against a wall burn the
+# rest of their energy (or of the 1200 frames) without learning anything.
+# Every `window` frames EarlyStop reviews the live agents and stops the
+# hopeless ones:
+#
+#   stuck   moved less than `stuck` pixels since the previous review
+#   pinned  hit a wall `hits` or more times since the previous review
+#   cutoff  even its best case can no longer reach the generation's
+#           reproduction cutoff (the ceil(survival_threshold * n)-th best of
+#           everyone's worst case; neat picks parents per species, so this is
+#           the population-wide approximation)
+#
+# A stopped agent is finalized as if it stayed where it is until its natural
+# end: the stage's settle(agent, frame, hit_rate) returns the fitness it
+# would still collect there (shaping reward, slow/hit penalties at the
+# observed rate) and the frames that saves. gain_bounds(agent, frame) is the
+# (worst, best) fitness change still possible, used by the cutoff rule.
+# Shared arena only: the cutoff compares agents of the same episode.
+
+REASONS = ('stuck', 'pinned', 'cutoff')
+
+class EarlyStop:
+    def __init__(self, settle, gain_bounds, window=60, stuck=0.0, hits=0, cutoff=False, survival_threshold=0.2):
+        self.settle, self.gain_bounds = settle, gain_bounds
+        self.window, self.stuck, self.hits, self.cutoff = window, stuck, hits, cutoff
+        self.survival_threshold = survival_threshold
+        self.stopped = dict.fromkeys(REASONS, 0)
+        self.frames_saved = 0
+
+    def start(self, agents, genomes):
+        """ A new episode: agents[i] is scored in genomes[i].fitness. """
+        self.agents, self.genomes = agents, genomes
+        self.anchors = [(a.x, a.y) for a in agents]
+        self.hit_marks = [getattr(a, 'wall_hits', 0) for a in agents]
+
+    def review(self, frame):
+        """ Call once per frame, after the rewards. Acts every window frames. """
+        if (frame + 1) % self.window: return
+        floor = self.cutoff_floor(frame) if self.cutoff else None
+        for i, agent in enumerate(self.agents):
+            if not agent.alive: continue
+            x0, y0 = self.anchors[i]
+            self.anchors[i] = (agent.x, agent.y)
+            hits = getattr(agent, 'wall_hits', 0) - self.hit_marks[i]
+            self.hit_marks[i] += hits
+            if self.stuck and math.hypot(agent.x - x0, agent.y - y0) < self.stuck: reason = 'stuck'
+            elif self.hits and hits >= self.hits: reason = 'pinned'
+            elif floor is not None and self.genomes[i].fitness + self.gain_bounds(agent, frame)[1] < floor:
+                reason = 'cutoff'
+            else: continue
+            gain, frames = self.settle(agent, frame, hits / self.window)
+            self.genomes[i].fitness += gain
+            agent.alive = False
+            self.stopped[reason] += 1
+            self.frames_saved += frames
+
+    def cutoff_floor(self, frame):
+        """ A fitness the reproduction cutoff is sure to reach by the end of the episode. """
+        worst = sorted((g.fitness + (self.gain_bounds(a, frame)[0] if a.alive else 0)
+                        for a, g in zip(self.agents, self.genomes)), reverse=True)
+        return worst[max(1, math.ceil(self.survival_threshold * len(worst))) - 1]
+
+def requested(options):
+    """ Whether any --stop-* rule is on. """
+    return bool(options.stop_stuck or options.stop_hits or options.stop_cutoff)
+
+def from_options(options, config, settle, gain_bounds):
+    """ The EarlyStop the --stop-* flags ask for, or None when no rule is on (or arenas are independent). """
+    if not requested(options): return None
+    if options.arena != 'shared':
+        print(" >> NOTICE: --stop-* is off with --arena independent (early stop runs in the shared arena only).")
+        return None
+    return EarlyStop(settle, gain_bounds, options.stop_window, options.stop_stuck, options.stop_hits,
+                     options.stop_cutoff, config.reproduction_config.survival_threshold)
+
+class EarlyStopReporter(neat.reporting.BaseReporter):
+    """ Prints how many agents each rule stopped and the agent-frames that saved, per generation. """
+    def __init__(self, early_stop):
+        self.early_stop = early_stop
+
+    def post_evaluate(self, config, population, species, best_genome):
+        e = self.early_stop
+        counts = ', '.join(f"{e.stopped[reason]} {reason}" for reason in REASONS)
+        print(f" >> Early stop: {counts} | {e.frames_saved:,.0f} agent-frames saved")
+        e.stopped = dict.fromkeys(REASONS, 0)
+        e.frames_saved = 0
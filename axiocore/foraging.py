@@ -0,0 +1,112 @@
+import numpy as np
+
+# --- PROJECT AXIOGEN: VECTORIZED FORAGING ENGINE (STAGE 1) ---
+# Struct-of-arrays version of the Stage 1 world. The whole population lives in
+# NumPy arrays (x, y, angle, vel, energy, alive, fitness) and every rule of
+# eval_genomes (radars, movement, friction, hunger, food, walls) is applied to
+# all agents at once, so a frame costs O(agents x foods) array work instead of
+# one Python loop iteration per agent per food.
+#
+# Semantics match the Python loop rule for rule, with one difference: all
+# agents sense and eat against the same food snapshot of the frame (a food
+# eaten this frame respawns for the next one). Agents eat in index order, as
+# in the sequential loop: each one takes the first food in list order within
+# its reach that no lower-index agent took this frame.
+
+RADAR_ANGLES = np.radians([-40, -20, 0, 20, 40])
+RADAR_RANGE = 250.0
+RADAR_CONE = 0.2
+EAT_RADIUS = 20
+
+class ForagingSwarm:
+    def __init__(self, world, n, rng, max_energy=400):
+        self.width, self.height = world.width, world.height
+        self.friction = world.friction
+        self.food_margin = world.food_margin
+        self.rng = rng
+        self.n = n
+        self.max_energy = max_energy
+
+        # Same spawn rules as Agent(): +-200px around the centre, random heading
+        self.x = (world.width // 2 + rng.integers(-200, 200, size=n, endpoint=True)).astype(float)
+        self.y = (world.height // 2 + rng.integers(-200, 200, size=n, endpoint=True)).astype(float)
+        self.angle = rng.integers(0, 360, size=n, endpoint=True).astype(float)
+        self.vel = np.zeros(n)
+        self.energy = np.full(n, float(max_energy))
+        self.alive = np.ones(n, dtype=bool)
+        self.fitness = np.zeros(n)
+
+        self.food = np.array(world.foods, dtype=float).reshape(-1, 2)
+        self.radars = np.full((n, len(RADAR_ANGLES)), RADAR_RANGE)
+
+    def respawn_food(self, idx):
+        k = len(idx)
+        m = self.food_margin
+        self.food[idx, 0] = self.rng.integers(m, self.width - m, size=k, endpoint=True)
+        self.food[idx, 1] = self.rng.integers(m, self.height - m, size=k, endpoint=True)
+
+    def sense(self, idx=None):
+        """ Radars for the agents in idx (default: all alive) against every food. """
+        if idx is None: idx = np.flatnonzero(self.alive)
+        dx = self.food[None, :, 0] - self.x[idx, None]
+        dy = self.food[None, :, 1] - self.y[idx, None]
+        dist = np.hypot(dx, dy)                                    # (A, F)
+        food_angle = np.arctan2(dy, dx)                            # (A, F)
+        radar_angle = np.radians(self.angle[idx, None]) + RADAR_ANGLES  # (A, R)
+
+        diff = np.abs(food_angle[:, None, :] - radar_angle[:, :, None])  # (A, R, F)
+        diff = np.mod(diff + np.pi, 2 * np.pi) - np.pi
+        seen = (np.abs(diff) < RADAR_CONE) & (dist < RADAR_RANGE)[:, None, :]
+        readings = np.where(seen, dist[:, None, :], RADAR_RANGE).min(axis=2, initial=RADAR_RANGE)
+        self.radars[idx] = readings
+        return readings
+
+    def inputs(self, idx):
+        return (RADAR_RANGE - self.radars[idx]) / RADAR_RANGE
+
+    def step(self, idx, outputs):
+        """
+        Advances the agents in idx (those alive at the start of the frame) by one
+        frame. outputs is (len(idx), 2): [speed, turn] per agent.
+        """
+        speed, turn = outputs[:, 0], outputs[:, 1]
+
+        # Agent.move
+        self.angle[idx] += turn * 10
+        vel = np.clip(self.vel[idx] + speed * 3, -2, 10)
+        rad = np.radians(self.angle[idx])
+        self.x[idx] += np.cos(rad) * vel
+        self.y[idx] += np.sin(rad) * vel
+        vel *= self.friction
+        self.vel[idx] = vel
+        self.energy[idx] -= 1.5
+        self.alive[idx[self.energy[idx] <= 0]] = False
+
+        # Too slow: punished and hungrier
+        slow = idx[self.vel[idx] < 3]
+        self.fitness[slow] -= 0.1
+        self.energy[slow] -= 2
+
+        self._eat(idx)
+
+        # Walls are lethal
+        x, y = self.x[idx], self.y[idx]
+        out = idx[(x < 5) | (x > self.width - 5) | (y < 5) | (y > self.height - 5)]
+        self.fitness[out] -= 5
+        self.alive[out] = False
+
+    def _eat(self, idx):
+        dx = self.x[idx, None] - self.food[None, :, 0]
+        dy = self.y[idx, None] - self.food[None, :, 1]
+        in_reach = np.hypot(dx, dy) < EAT_RADIUS                  # (A, F)
+        taken = np.zeros(len(self.food), dtype=bool)
+        # Agents at a food are few: settle them one by one in index order, as the sequential loop does
+        for a in np.flatnonzero(in_reach.any(axis=1)).tolist():
+            free = np.flatnonzero(in_reach[a] & ~taken)
+            if not len(free): continue
+            taken[free[0]] = True # first food in list order
+            self.fitness[idx[a]] += 10
+            self.energy[idx[a]] = self.max_energy
+        eaten = np.flatnonzero(taken)
+        if len(eaten): self.respawn_food(eaten)
+
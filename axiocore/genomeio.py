@@ -0,0 +1,165 @@
+import hashlib
+import os
+import pickle
+import struct
+
+import numpy as np
+import neat
+from neat.graphs import feed_forward_layers
+
+from axiocore import runtime
+
+# --- PROJECT AXIOGEN: GENOME FILES (.axg) ---
+# A compact binary format for handing brains from one stage to the next and
+# for archives of many brains. Unlike a pickle of neat.DefaultGenome it does
+# not depend on neat-python's class layout, can be inspected without building
+# any objects, and is memory-mapped, so thousands of genomes load in
+# milliseconds and worker processes share the same pages.
+#
+#   header   magic, version, num_inputs, num_outputs, genome count,
+#            name table size, sha1 of everything after the header
+#   names    activation/aggregation names, '\n'-separated
+#   index    per genome: key, fitness, first node/connection row, counts
+#   nodes    key, bias, response, activation id, aggregation id
+#   conns    in, out, weight, enabled
+#
+# Node and connection rows keep the genome's dict order, so a network built
+# from the file evaluates exactly like one built from the original genome.
+
+MAGIC = b'AXGN'
+VERSION = 1
+HEADER = struct.Struct('<4sHHHII20s')
+INDEX_DTYPE = np.dtype([('key', '<i8'), ('fitness', '<f8'), ('node_start', '<i8'), ('node_count', '<i8'),
+                        ('conn_start', '<i8'), ('conn_count', '<i8')])
+NODE_DTYPE = np.dtype([('key', '<i4'), ('bias', '<f8'), ('response', '<f8'),
+                       ('activation', 'u1'), ('aggregation', 'u1')])
+CONN_DTYPE = np.dtype([('in', '<i4'), ('out', '<i4'), ('weight', '<f8'), ('enabled', 'u1')])
+
+def save(path, genomes, config):
+    """ Writes genomes (one genome or a list) to path, atomically. """
+    with runtime.atomic_write(path) as f:
+        f.write(pack(genomes, config))
+
+def pack(genomes, config):
+    """ genomes (one genome or a list) as the bytes of an .axg file. """
+    if isinstance(genomes, neat.DefaultGenome): genomes = [genomes]
+    gc = config.genome_config
+    names = []
+    def name_id(name):
+        if name not in names: names.append(name)
+        return names.index(name)
+
+    index = np.zeros(len(genomes), dtype=INDEX_DTYPE)
+    nodes, conns = [], []
+    for i, g in enumerate(genomes):
+        index[i] = (g.key, np.nan if g.fitness is None else g.fitness,
+                    len(nodes), len(g.nodes), len(conns), len(g.connections))
+        nodes += [(n.key, n.bias, n.response, name_id(n.activation), name_id(n.aggregation)) for n in g.nodes.values()]
+        conns += [(c.key[0], c.key[1], c.weight, c.enabled) for c in g.connections.values()]
+
+    name_bytes = '\n'.join(names).encode('utf-8')
+    payload = b''.join([name_bytes, index.tobytes(), np.array(nodes, dtype=NODE_DTYPE).tobytes(),
+                        np.array(conns, dtype=CONN_DTYPE).tobytes()])
+    header = HEADER.pack(MAGIC, VERSION, gc.num_inputs, gc.num_outputs, len(genomes),
+                         len(name_bytes), hashlib.sha1(payload).digest())
+    return header + payload
+
+class GenomeArchive:
+    """
+    A memory-mapped .axg file, or the same bytes in memory (buffer=, e.g. a
+    shared memory segment; path is then only a label). verify=True checks the
+    content hash on open.
+    """
+    def __init__(self, path, verify=True, buffer=None):
+        self.path = path
+        if buffer is None:
+            with open(path, 'rb') as f:
+                raw = f.read(HEADER.size)
+        else:
+            raw = bytes(buffer[:HEADER.size])
+        if len(raw) < HEADER.size:
+            raise ValueError(f"{path}: not a genome file (too short)")
+        magic, version, self.num_inputs, self.num_outputs, count, names_size, digest = HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a genome file")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported genome file version {version}")
+
+        if buffer is None:
+            buf = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size)
+        else:
+            buf = np.frombuffer(buffer, dtype=np.uint8)[HEADER.size:]
+            buf.flags.writeable = False
+        if verify and hashlib.sha1(buf).digest() != digest:
+            raise ValueError(f"{path}: content hash mismatch (corrupt or truncated file)")
+        self.hash = digest.hex()
+
+        self.names = bytes(buf[:names_size]).decode('utf-8').split('\n')
+        pos = names_size
+        self.index = buf[pos:pos + count * INDEX_DTYPE.itemsize].view(INDEX_DTYPE)
+        pos += self.index.nbytes
+        num_nodes = int(self.index['node_count'].sum())
+        self.nodes = buf[pos:pos + num_nodes * NODE_DTYPE.itemsize].view(NODE_DTYPE)
+        pos += self.nodes.nbytes
+        num_conns = int(self.index['conn_count'].sum())
+        self.conns = buf[pos:pos + num_conns * CONN_DTYPE.itemsize].view(CONN_DTYPE)
+
+    def __len__(self):
+        return len(self.index)
+
+    def _rows(self, i):
+        entry = self.index[i]
+        nodes = self.nodes[entry['node_start']:entry['node_start'] + entry['node_count']]
+        conns = self.conns[entry['conn_start']:entry['conn_start'] + entry['conn_count']]
+        return entry, nodes, conns
+
+    def genome(self, i, config):
+        """ Rebuilds genome i as a config.genome_type (DefaultGenome). """
+        gc = config.genome_config
+        entry, nodes, conns = self._rows(i)
+        genome = config.genome_type(int(entry['key']))
+        fitness = float(entry['fitness'])
+        genome.fitness = None if np.isnan(fitness) else fitness
+        for key, bias, response, act, agg in nodes.tolist():
+            node = gc.node_gene_type(key)
+            node.bias, node.response = bias, response
+            node.activation, node.aggregation = self.names[act], self.names[agg]
+            genome.nodes[key] = node
+        for i_node, o_node, weight, enabled in conns.tolist():
+            conn = gc.connection_gene_type((i_node, o_node))
+            conn.weight, conn.enabled = weight, bool(enabled)
+            genome.connections[(i_node, o_node)] = conn
+        return genome
+
+    def genomes(self, config):
+        return [self.genome(i, config) for i in range(len(self))]
+
+    def network(self, i, config):
+        """ Genome i straight to a neat FeedForwardNetwork, without building a genome. """
+        gc = config.genome_config
+        _, nodes, conns = self._rows(i)
+        inputs = [-k - 1 for k in range(self.num_inputs)]
+        outputs = list(range(self.num_outputs))
+        links = [((i_node, o_node), weight) for i_node, o_node, weight, enabled in conns.tolist() if enabled]
+        node_rows = {key: (bias, response, act, agg) for key, bias, response, act, agg in nodes.tolist()}
+        node_evals = []
+        for layer in feed_forward_layers(inputs, outputs, [key for key, _ in links]):
+            for node in layer:
+                bias, response, act, agg = node_rows[node]
+                node_evals.append((node, gc.activation_defs.get(self.names[act]),
+                                   gc.aggregation_function_defs.get(self.names[agg]), bias, response,
+                                   [(i_node, weight) for (i_node, o_node), weight in links if o_node == node]))
+        return neat.nn.FeedForwardNetwork(inputs, outputs, node_evals)
+
+def load_genome(path, config, i=0):
+    return GenomeArchive(path).genome(i, config)
+
+def load_brain(stem, config):
+    """
+    The brain saved as stem.axg, or as a legacy pickle (stem.pkl) when there
+    is no .axg. Raises FileNotFoundError when neither exists.
+    """
+    if os.path.exists(stem + '.axg'):
+        return load_genome(stem + '.axg', config)
+    with open(stem + '.pkl', 'rb') as f:
+        return pickle.load(f)
@@ -0,0 +1,242 @@
+import argparse
+import asyncio
+import collections
+import json
+import select
+import socket
+import sys
+import threading
+import time
+
+import neat
+
+# --- PROJECT AXIOGEN: LIVE STATS ---
+# --live PORT makes a stage serve its per-generation stats while it trains:
+# every row recorded into the generation log (max/avg fitness, alive or
+# success counts), the --timings rows (agent-steps/s) and one row from
+# LiveReporter (seconds and genomes/s per generation, species, best) go out
+# as JSON lines ({"kind": ..., column: value, ...}) to every connected viewer.
+#
+# The server is an asyncio loop on a daemon thread. publish() only encodes
+# the row and hands it to that loop, so the training loop never waits on the
+# network; a viewer that falls too far behind is disconnected. New viewers
+# first get the rows so far (the last `history`), then the live ones.
+#
+#   python axiogen_stage2.py --headless --live 8765
+#   python -m axiocore.live --port 8765           # plots, updated in place
+#   python -m axiocore.live --port 8765 --text    # one line per row
+#
+# The server binds 127.0.0.1; watch a remote run through an SSH tunnel
+# (ssh -L 8765:localhost:8765 host) or bind another address with --live-host.
+
+MAX_BACKLOG = 1 << 20 # bytes a viewer may fall behind before it is dropped
+
+def plain(value):
+    """ JSON fallback for NumPy scalars. """
+    if hasattr(value, 'item'): return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class LiveServer:
+    def __init__(self, port, host='127.0.0.1', history=10000):
+        self.host = host
+        self.history = collections.deque(maxlen=history)
+        self.clients = set()
+        self.error = None
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._serve, args=(port, ready), daemon=True, name='axiogen-live')
+        self.thread.start()
+        ready.wait()
+        if self.error is not None: raise self.error
+
+    def _serve(self, port, ready):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(asyncio.start_server(self._client, self.host, port))
+        except OSError as e:
+            self.error = e
+            ready.set()
+            return
+        self.port = self.server.sockets[0].getsockname()[1] # the real one when port is 0
+        ready.set()
+        self.loop.run_forever()
+        self.server.close()
+        for writer in self.clients: writer.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    async def _client(self, reader, writer):
+        writer.writelines(self.history)
+        self.clients.add(writer)
+        try:
+            await reader.read() # viewers send nothing: returns when they disconnect
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def _send(self, line):
+        self.history.append(line)
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                self.clients.discard(writer)
+                writer.close()
+            else:
+                writer.write(line)
+
+    def publish(self, kind, row):
+        """ Sends one row to every viewer. Safe to call from the training thread; never blocks. """
+        line = json.dumps({'kind': kind, **row}, default=plain) + '\n'
+        self.loop.call_soon_threadsafe(self._send, line.encode('utf-8'))
+
+    def publisher(self, kind):
+        """ publish() for one kind of row: what MetricsLog.publish expects. """
+        return lambda row: self.publish(kind, row)
+
+    def close(self):
+        if self.loop.is_running(): self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+class LiveReporter(neat.reporting.BaseReporter):
+    """ Publishes the wall time and genomes/s of every generation, its species count and best fitness. """
+    def __init__(self, server):
+        self.server = server
+        self.generation = 0
+        self.started = time.perf_counter()
+
+    def start_generation(self, generation):
+        self.generation = generation + 1 # same numbering as the stage logs
+        self.started = time.perf_counter()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        seconds = time.perf_counter() - self.started
+        self.server.publish('trainer', {'generation': self.generation, 'seconds': seconds,
+                                        'genomes_per_s': len(population) / seconds if seconds else 0.0,
+                                        'species': len(species.species), 'best': best_genome.fitness})
+
+def from_options(options, population, logs):
+    """
+    The LiveServer --live asks for (None without it). Every log in
+    {kind: MetricsLog or None} publishes its rows to it, and a LiveReporter
+    is added to the population.
+    """
+    if options.live is None: return None
+    server = LiveServer(options.live, options.live_host)
+    for kind, log in logs.items():
+        if log is not None: log.publish = server.publisher(kind)
+    population.add_reporter(LiveReporter(server))
+    print(f" >> Live stats on {server.host}:{server.port} (watch with: python -m axiocore.live --port {server.port})")
+    return server
+
+# --- Viewer ---
+
+def rows(host, port, wait=0.5):
+    """
+    Yields every row the trainer sends, and None whenever nothing arrived for
+    `wait` seconds (time to redraw). Retries until the trainer is up; returns
+    when it closes the connection.
+    """
+    while True:
+        try:
+            sock = socket.create_connection((host, port))
+            break
+        except OSError:
+            yield None
+            time.sleep(wait)
+    buffer = b''
+    with sock:
+        while True:
+            readable, _, _ = select.select([sock], [], [], wait)
+            if not readable:
+                yield None
+                continue
+            data = sock.recv(65536)
+            if not data: return
+            *lines, buffer = (buffer + data).split(b'\n')
+            for line in lines:
+                if line: yield json.loads(line)
+
+def fitness_column(name):
+    return name.startswith(('Max', 'Avg'))
+
+class LivePlot:
+    """ Three panels (fitness, counts, throughput) whose lines grow as rows arrive. """
+    def __init__(self, plt):
+        self.plt = plt
+        self.fig, axes = plt.subplots(3, 1, figsize=(11, 9), sharex=True)
+        self.axes = dict(zip(('fitness', 'counts', 'throughput'), axes))
+        for (name, ax), label in zip(self.axes.items(), ("Fitness", "Alive / Success", "Per second")):
+            ax.set_ylabel(label)
+            ax.grid(True, linestyle='--', alpha=0.6)
+        axes[-1].set_xlabel("Generation")
+        self.lines = {} # (panel, column) -> (Line2D, xs, ys)
+        self.dirty = set()
+
+    def add(self, row):
+        kind = row.get('kind')
+        if kind == 'generation':
+            x = row.get('Generation')
+            columns = [(('fitness' if fitness_column(c) else 'counts'), c) for c in row if c not in ('kind', 'Generation')]
+        elif kind == 'trainer':
+            x, columns = row.get('generation'), [('throughput', 'genomes_per_s')]
+        elif kind == 'timings':
+            x, columns = row.get('generation'), [('throughput', 'agent_steps_per_s')]
+        else:
+            return
+        for panel, column in columns:
+            value = row.get(column)
+            if not isinstance(value, (int, float)): continue
+            key = (panel, column)
+            if key not in self.lines:
+                line, = self.axes[panel].plot([], [], label=column)
+                self.lines[key] = (line, [], [])
+                self.axes[panel].legend(loc='upper left')
+            _, xs, ys = self.lines[key]
+            xs.append(x)
+            ys.append(value)
+            self.dirty.add(key)
+
+    def redraw(self):
+        for key in self.dirty:
+            line, xs, ys = self.lines[key]
+            line.set_data(xs, ys)
+            ax = self.axes[key[0]]
+            ax.relim()
+            ax.autoscale_view()
+        self.dirty.clear()
+        self.plt.pause(0.01)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a running AXIOGEN stage started with --live PORT.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--text', action='store_true', help="Print the rows instead of plotting them.")
+    args = parser.parse_args(argv)
+
+    if args.text:
+        for row in rows(args.host, args.port):
+            if row is None: continue
+            kind = row.pop('kind', '?')
+            print(f"[{kind}] " + ' | '.join(f"{k}: {v:.4g}" if isinstance(v, float) else f"{k}: {v}"
+                                           for k, v in row.items()), flush=True)
+        return 0
+
+    import matplotlib.pyplot as plt
+    plt.ion()
+    plot = LivePlot(plt)
+    plot.fig.suptitle(f"AXIOGEN live: {args.host}:{args.port}")
+    for row in rows(args.host, args.port, wait=0.1):
+        if row is not None:
+            plot.add(row)
+            continue
+        plot.redraw() # also keeps the window responsive while nothing arrives
+        if not plt.get_fignums(): return 0 # window closed
+    plot.redraw()
+    print(" >> Training finished; close the window to exit.")
+    plt.ioff()
+    plt.show()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
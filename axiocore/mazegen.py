@@ -0,0 +1,74 @@
+import random
+
+# --- PROJECT AXIOGEN: PROCEDURAL MAZES ---
+# Labyrinths of any size for the maze worlds: a grid of cols x rows rooms of
+# `cell` pixels, carved into a perfect maze by a randomized depth-first
+# search (every room reachable, exactly one path between two rooms), then
+# `loops` of the remaining inner walls knocked out so there is more than one
+# way around. Walls sit on the room boundaries, `thickness` pixels wide, and
+# collinear pieces are merged into one rect per straight run, so a 50 x 40
+# labyrinth comes out as about a thousand walls.
+#
+# Everything is drawn from rng (the stage passes its `random` module), so a
+# seeded run builds the same labyrinths.
+
+def carve(cols, rows, rng=random, loops=0.0):
+    """
+    (east, south) wall flags: east[r][c] is the wall between room (c, r) and
+    (c + 1, r), south[r][c] the one between (c, r) and (c, r + 1).
+    """
+    east = [[True] * cols for _ in range(rows)]
+    south = [[True] * cols for _ in range(rows)]
+    seen = [[False] * cols for _ in range(rows)]
+    stack = [(rng.randrange(cols), rng.randrange(rows))]
+    seen[stack[0][1]][stack[0][0]] = True
+    while stack:
+        c, r = stack[-1]
+        options = [(dc, dr) for dc, dr in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                   if 0 <= c + dc < cols and 0 <= r + dr < rows and not seen[r + dr][c + dc]]
+        if not options:
+            stack.pop()
+            continue
+        dc, dr = rng.choice(options)
+        if dc == 1: east[r][c] = False
+        elif dc == -1: east[r][c - 1] = False
+        elif dr == 1: south[r][c] = False
+        else: south[r - 1][c] = False
+        seen[r + dr][c + dc] = True
+        stack.append((c + dc, r + dr))
+    if loops:
+        inner = [(east, r, c) for r in range(rows) for c in range(cols - 1) if east[r][c]]
+        inner += [(south, r, c) for r in range(rows - 1) for c in range(cols) if south[r][c]]
+        for flags, r, c in rng.sample(inner, int(loops * len(inner))):
+            flags[r][c] = False
+    return east, south
+
+def labyrinth(x, y, cols, rows, cell, thickness, rng=random, loops=0.0):
+    """
+    Wall rects (x, y, w, h) of a random labyrinth whose rooms start at (x, y).
+    Only inner walls: the world's border walls close it.
+    """
+    east, south = carve(cols, rows, rng, loops)
+    half = thickness // 2
+    walls = []
+    # Horizontal runs along the boundary below each row of rooms
+    for r in range(rows - 1):
+        c = 0
+        while c < cols:
+            if not south[r][c]:
+                c += 1
+                continue
+            start = c
+            while c < cols and south[r][c]: c += 1
+            walls.append((x + start * cell - half, y + (r + 1) * cell - half, (c - start) * cell + thickness, thickness))
+    # Vertical runs along the boundary right of each column of rooms
+    for c in range(cols - 1):
+        r = 0
+        while r < rows:
+            if not east[r][c]:
+                r += 1
+                continue
+            start = r
+            while r < rows and east[r][c]: r += 1
+            walls.append((x + (c + 1) * cell - half, y + start * cell - half, thickness, (r - start) * cell + thickness))
+    return walls
@@ -0,0 +1,73 @@
+import collections
+import hashlib
+
+import neat
+
+# --- PROJECT AXIOGEN: FITNESS MEMOIZATION ---
+# With elitism the best genomes of a generation come back unchanged in the
+# next one, and in a deterministic world their episode would play out exactly
+# as before. FitnessCache remembers (fitness, success) per genome hash and
+# episode, so those genomes get their result back without being simulated.
+#
+# The hash covers every node and connection gene that decides the network's
+# output (in dict order, which is the order neat sums inputs in). The episode
+# is whatever else the result depends on (world layout, seed). Least recently
+# used entries are evicted once max_entries is reached.
+#
+# Only valid where a genome's result depends on nothing but its genes and the
+# episode: Stage 3 (fixed world, no randomness, agents never interact). Stage
+# 4 does not qualify: plasticity draws from the shared random stream on every
+# collision and writes the learned weights back into the genome.
+
+def genome_hash(genome):
+    nodes = [(k, n.bias, n.response, n.activation, n.aggregation) for k, n in genome.nodes.items()]
+    conns = [(k, c.weight, c.enabled) for k, c in genome.connections.items()]
+    return hashlib.blake2b(repr((nodes, conns)).encode('utf-8'), digest_size=16).digest()
+
+class FitnessCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict() # (hash, episode) -> (fitness, success)
+        self.hits = self.misses = self.evictions = 0
+
+    def recall(self, genomes, episode):
+        """
+        Sets the fitness of every (id, genome) pair whose result is cached.
+        Returns (pairs still to simulate, their keys, successes among the recalled).
+        """
+        todo, keys, successes = [], [], 0
+        for pair in genomes:
+            key = (genome_hash(pair[1]), episode)
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                todo.append(pair)
+                keys.append(key)
+                continue
+            self.hits += 1
+            self.entries.move_to_end(key)
+            pair[1].fitness = result[0]
+            successes += result[1]
+        return todo, keys, successes
+
+    def store(self, keys, genomes, successes):
+        """ Remembers the results of the simulated pairs returned by recall(). """
+        for key, (_, genome), success in zip(keys, genomes, successes):
+            self.entries[key] = (genome.fitness, bool(success))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+class CacheReporter(neat.reporting.BaseReporter):
+    """ Prints the cache's hit/miss counts for every generation. """
+    def __init__(self, cache):
+        self.cache = cache
+        self.seen = (0, 0, 0)
+
+    def post_evaluate(self, config, population, species, best_genome):
+        c = self.cache
+        hits, misses, evictions = (now - before for now, before in zip((c.hits, c.misses, c.evictions), self.seen))
+        self.seen = (c.hits, c.misses, c.evictions)
+        rate = 100 * hits / (hits + misses) if hits + misses else 0.0
+        print(f" >> Fitness cache: {hits} hits, {misses} misses ({rate:.0f}% skipped) | "
+              f"{len(c.entries)} entries, {evictions} evicted")
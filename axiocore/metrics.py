@@ -0,0 +1,97 @@
+import csv
+import os
+import time
+
+import numpy as np
+
+# --- PROJECT AXIOGEN: METRICS LOG ---
+# Buffered telemetry sink. Rows (per generation) or whole columns (per frame,
+# per agent) are kept in memory and written out every flush_seconds, or when
+# the buffer gets large, so logging costs a list append in the hot loop.
+#
+# Nothing touches the disk before the first flush: importing a stage (or
+# forking a worker) no longer creates log files.
+#
+# The columnar file (.axm) is a sequence of chunks, one per flush. A chunk is
+# the column names followed by one array per column, all as consecutive .npy
+# records, so appending never rewrites earlier data and read() concatenates
+# the chunks back into one array per column. With csv_path set the same rows
+# are also appended to a CSV (what the grapher scripts read).
+#
+# publish, when set, is called with every record()ed row as it comes in
+# (axiocore/live.py streams them to a viewer). Bulk record_many() columns
+# (per-frame telemetry) are not published.
+
+class MetricsLog:
+    def __init__(self, path=None, csv_path=None, flush_seconds=10.0, max_rows=100000):
+        self.path, self.csv_path = path, csv_path
+        self.flush_seconds, self.max_rows = flush_seconds, max_rows
+        self.columns = None
+        self.buffer = []  # list of {column: sequence}
+        self.buffered_rows = 0
+        self.last_flush = time.monotonic()
+        self.csv_started = False
+        self.publish = None # callable(row), see above
+
+    def record(self, row):
+        """ One row: {column: value}. """
+        if self.publish is not None: self.publish(row)
+        self.record_many({name: [value] for name, value in row.items()})
+
+    def record_many(self, columns):
+        """ Many rows at once: {column: equal-length sequence}. """
+        if self.columns is None:
+            self.columns = list(columns)
+        elif list(columns) != self.columns:
+            raise ValueError(f"metrics columns changed: {list(columns)} != {self.columns}")
+        self.buffer.append(columns)
+        self.buffered_rows += len(next(iter(columns.values()), ()))
+        if self.buffered_rows >= self.max_rows or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buffer: return
+        chunk = {name: np.concatenate([np.asarray(c[name]) for c in self.buffer]) for name in self.columns}
+        self.buffer, self.buffered_rows = [], 0
+
+        if self.path is not None:
+            with open(self.path, 'ab') as f:
+                np.save(f, np.array(self.columns))
+                for name in self.columns:
+                    np.save(f, chunk[name])
+        if self.csv_path is not None:
+            write_csv(self.csv_path, self.columns, chunk, header=not self.csv_started)
+            self.csv_started = True
+
+    def close(self):
+        self.flush()
+
+def write_csv(path, columns, chunk, header=True):
+    with open(path, mode='w' if header else 'a', newline='') as f:
+        writer = csv.writer(f)
+        if header: writer.writerow(columns)
+        writer.writerows(zip(*(chunk[name].tolist() for name in columns)))
+
+def read(path):
+    """ {column: array} with every chunk of an .axm file concatenated. """
+    chunks = []
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        while f.tell() < size:
+            names = np.load(f).tolist()
+            chunks.append({name: np.load(f) for name in names})
+    if not chunks: return {}
+    return {name: np.concatenate([c[name] for c in chunks]) for name in chunks[0]}
+
+def export_csv(path, csv_path):
+    """ Converts an .axm file to CSV. """
+    data = read(path)
+    write_csv(csv_path, list(data), data)
+
+def agent_frame(generation, frame, x, y, alive, fitness):
+    """ One frame of per-agent columns, for a --log-frames log. """
+    n = len(x)
+    return {'generation': np.full(n, generation), 'frame': np.full(n, frame), 'agent': np.arange(n),
+            'x': np.asarray(x, dtype=float), 'y': np.asarray(y, dtype=float),
+            'alive': np.asarray(alive, dtype=bool), 'fitness': np.asarray(fitness, dtype=float)}
@@ -0,0 +1,161 @@
+import heapq
+import math
+
+import neat
+
+# --- PROJECT AXIOGEN: BEHAVIOUR ARCHIVE ---
+# Novelty relative to the past: every evaluated agent leaves a behaviour
+# descriptor (Stage 2: where its episode ended) in a bounded archive, and an
+# agent's novelty is the mean distance from its descriptor to the k nearest
+# ones already there. Once max_entries is reached the oldest are evicted.
+#
+# The archive is indexed by an incremental KD-tree: leaves hold up to
+# `bucket` descriptors and split at the median of their widest axis when
+# they overflow, so inserting, evicting and a k-nearest query each follow one
+# root-to-leaf path plus the few neighbouring leaves, not the whole archive.
+# Clustered descriptors (most explorers end near the start) just get deeper
+# leaves; identical descriptors (explorers that never moved) share one leaf.
+# Evictions leave the tree's splits in place, so it is rebuilt from
+# the live entries (balanced again) after every len(archive) insertions.
+# state() / load() carry the entries through Stage 2's checkpoints.
+
+class _Node:
+    """ A leaf (keys is a list) or a split (keys is None; low holds point[axis] < value). """
+    __slots__ = ('keys', 'axis', 'value', 'low', 'high')
+    def __init__(self, keys=None, axis=0, value=0.0, low=None, high=None):
+        self.keys, self.axis, self.value, self.low, self.high = keys, axis, value, low, high
+
+class BehaviourArchive:
+    def __init__(self, max_entries=100000, k=15, bucket=16):
+        self.max_entries, self.k, self.bucket = max_entries, k, bucket
+        self.points = {} # key -> descriptor tuple, oldest first
+        self.next_key = 0
+        self.root = _Node([])
+        self.since_build = 0
+        self.evictions = 0
+        self.last_scores = []
+
+    def __len__(self):
+        return len(self.points)
+
+    def _leaf(self, point):
+        node = self.root
+        while node.keys is None:
+            node = node.low if point[node.axis] < node.value else node.high
+        return node
+
+    def add(self, point):
+        """ Inserts a descriptor, evicting the oldest one when full. Returns its key. """
+        point = tuple(float(v) for v in point)
+        key = self.next_key
+        self.next_key += 1
+        self.points[key] = point
+        leaf = self._leaf(point)
+        leaf.keys.append(key)
+        if len(leaf.keys) > self.bucket: self._split(leaf)
+        while len(self.points) > self.max_entries:
+            self.remove(next(iter(self.points)))
+            self.evictions += 1
+        self.since_build += 1
+        if self.since_build > len(self.points): self.rebuild()
+        return key
+
+    def remove(self, key):
+        self._leaf(self.points[key]).keys.remove(key)
+        del self.points[key]
+
+    def _partition(self, keys):
+        """ (axis, value, low keys, high keys) splitting keys at the median of their widest axis, or None. """
+        points = [self.points[key] for key in keys]
+        spreads = [max(c) - min(c) for c in zip(*points)]
+        axis = max(range(len(spreads)), key=spreads.__getitem__)
+        if spreads[axis] == 0: return None # all the same descriptor: nothing to split
+        values = sorted(p[axis] for p in points)
+        value = values[len(values) // 2]
+        if value == values[0]: value = next(v for v in values if v > value)
+        low = [key for key, p in zip(keys, points) if p[axis] < value]
+        high = [key for key, p in zip(keys, points) if p[axis] >= value]
+        return axis, value, low, high
+
+    def _split(self, leaf):
+        # The leaf turns into a split node in place: its parent keeps pointing at it
+        parts = self._partition(leaf.keys)
+        if parts is None: return
+        leaf.axis, leaf.value, low, high = parts
+        leaf.keys, leaf.low, leaf.high = None, _Node(low), _Node(high)
+
+    def state(self):
+        """ The entries (oldest first) and counters, for checkpoints. """
+        return {'points': list(self.points.values()), 'next_key': self.next_key, 'evictions': self.evictions}
+
+    def load(self, state):
+        """ Restores state() output. The tree is rebuilt: its shape never changes a query's result. """
+        points = state['points'][-self.max_entries:] if self.max_entries else []
+        first = state['next_key'] - len(points)
+        self.points = {first + i: tuple(p) for i, p in enumerate(points)}
+        self.next_key = state['next_key']
+        self.evictions = state['evictions'] + len(state['points']) - len(points)
+        self.rebuild()
+
+    def rebuild(self):
+        """ A balanced tree over the current entries. """
+        def build(keys):
+            if len(keys) <= self.bucket: return _Node(keys)
+            parts = self._partition(keys)
+            if parts is None: return _Node(keys)
+            axis, value, low, high = parts
+            return _Node(None, axis, value, build(low), build(high))
+        self.root = build(list(self.points))
+        self.since_build = 0
+
+    def nearest(self, point, k=None):
+        """ Distances from point to its k nearest entries (fewer if the archive is smaller), closest first. """
+        k = self.k if k is None else k
+        if k <= 0 or not self.points: return []
+        point = tuple(float(v) for v in point)
+        best = [] # max-heap (negated squared distances) of the k closest so far
+        def search(node):
+            if node.keys is not None:
+                # Only a leaf of identical descriptors outgrows its bucket: k of them are enough
+                keys = node.keys if len(node.keys) <= self.bucket else node.keys[:k]
+                for key in keys:
+                    d = sum((a - b) ** 2 for a, b in zip(point, self.points[key]))
+                    if len(best) < k: heapq.heappush(best, -d)
+                    elif d < -best[0]: heapq.heapreplace(best, -d)
+                return
+            diff = point[node.axis] - node.value
+            near, far = (node.low, node.high) if diff < 0 else (node.high, node.low)
+            search(near)
+            # The far side can only hold something closer if the split plane is closer
+            if len(best) < k or diff * diff < -best[0]: search(far)
+        search(self.root)
+        return sorted(math.sqrt(-d) for d in best)
+
+    def novelty(self, point, k=None):
+        """ Mean distance to the k nearest entries, 0.0 while the archive is empty. """
+        dists = self.nearest(point, k)
+        return sum(dists) / len(dists) if dists else 0.0
+
+    def score(self, behaviours):
+        """ Novelty of every descriptor against the archive as it was, then archives them all. """
+        scores = [self.novelty(b) for b in behaviours]
+        for b in behaviours: self.add(b)
+        self.last_scores = scores
+        return scores
+
+def from_options(options):
+    """ The archive --novelty asks for, or None (off, or independent arenas). """
+    if options.arena != 'shared' or not options.novelty: return None
+    return BehaviourArchive(options.novelty_size, options.novelty_k)
+
+class NoveltyReporter(neat.reporting.BaseReporter):
+    """ Prints the generation's novelty scores and the archive size. """
+    def __init__(self, archive):
+        self.archive = archive
+
+    def post_evaluate(self, config, population, species, best_genome):
+        a = self.archive
+        scores = a.last_scores
+        mean = sum(scores) / len(scores) if scores else 0.0
+        print(f" >> Novelty: mean {mean:.1f}, best {max(scores, default=0.0):.1f} | "
+              f"archive {len(a):,} entries, {a.evictions:,} evicted")
@@ -0,0 +1,111 @@
+import math
+import multiprocessing
+import os
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+from axiocore import genomeio, runtime
+
+# --- PROJECT AXIOGEN: PARALLEL ARENAS ---
+# "shared" arena: the whole population lives in one world (today's semantics,
+# single core). "independent" arenas: every genome gets its own copy of the
+# generation's world, rebuilt from one seed, so genomes can be spread over a
+# process pool. All genomes of a generation see the same layout and the same
+# random stream, so results do not depend on the number of workers.
+#
+# Genomes do not travel to the workers as pickles: every generation the parent
+# packs the whole population into one .axg image (genomeio.pack: node and
+# connection arrays) in a shared memory segment, and a job is just (genome
+# index, seed, generation). Workers attach to the segment read-only and
+# rebuild their genomes from it; only fitness, flags and the weights plastic
+# stages changed come back. Worlds never cross either: workers rebuild them
+# from the seed, reuse the compiled world files and ray-cast tables they
+# inherited at fork, and map the same sensor table files.
+
+ARENAS = ('shared', 'independent')
+
+# What a worker sends back per genome. weights carries plastic (learned)
+# connection weights for stages that edit the genome during its life.
+Result = namedtuple('Result', ['fitness', 'alive', 'success', 'weights'])
+
+_config = None
+
+def _init_worker(config):
+    global _config
+    _config = config
+
+_attached = None # (segment name, SharedMemory, GenomeArchive) of this worker's current generation
+
+def _generation_archive(name, size):
+    global _attached
+    if _attached is None or _attached[0] != name:
+        if _attached is not None:
+            old = _attached[1]
+            _attached = None # drops the archive's views of the old segment first
+            old.close()
+        segment = shared_memory.SharedMemory(name=name)
+        archive = genomeio.GenomeArchive(f"shm:{name}", verify=False, buffer=segment.buf[:size])
+        _attached = (name, segment, archive)
+    return _attached[2]
+
+def _run_one(evaluate_alone, name, size, index, seed, generation):
+    genome = _generation_archive(name, size).genome(index, _config)
+    return evaluate_alone(genome, _config, seed, generation)
+
+def pool_context():
+    # fork keeps the already-imported stage module (no re-import, no new CSV files)
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+class ArenaPool:
+    """
+    Evaluates genomes in independent arenas. evaluate_alone(genome, config,
+    seed, generation) must be a module-level function returning a Result.
+    workers=1 runs in-process (handy for debugging, same results).
+    """
+    def __init__(self, evaluate_alone, config, workers=None):
+        self.evaluate_alone = evaluate_alone
+        self.config = config
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+        if self.workers > 1:
+            # Workers must share the parent's resource tracker: one of their own would "clean up" the
+            # generation's segment (and warn) when the worker exits
+            resource_tracker.ensure_running()
+            self.pool = pool_context().Pool(self.workers, initializer=_init_worker, initargs=(config,))
+
+    def evaluate(self, genomes, seed, generation=0):
+        """ Runs every (genome_id, genome) pair, writes genome.fitness back and returns the Results. """
+        genomes = list(genomes)
+        if not genomes: return []
+        if self.pool is None:
+            # evaluate_alone reseeds the global RNGs; in-process, that must not touch the trainer's streams
+            with runtime.preserved_rng():
+                results = [self.evaluate_alone(g, self.config, seed, generation) for _, g in genomes]
+        else:
+            image = genomeio.pack([g for _, g in genomes], self.config)
+            segment = shared_memory.SharedMemory(create=True, size=len(image))
+            try:
+                segment.buf[:len(image)] = image
+                # A few shards per worker keeps the pool busy when episode lengths differ
+                chunk = max(1, math.ceil(len(genomes) / (self.workers * 4)))
+                jobs = [(self.evaluate_alone, segment.name, len(image), i, seed, generation)
+                        for i in range(len(genomes))]
+                results = self.pool.starmap(_run_one, jobs, chunksize=chunk)
+            finally:
+                segment.close()
+                segment.unlink()
+
+        for (_, genome), result in zip(genomes, results):
+            genome.fitness = result.fitness
+            if result.weights:
+                for key, weight in result.weights.items():
+                    genome.connections[key].weight = weight
+        return results
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
@@ -0,0 +1,71 @@
+import numpy as np
+
+# --- PROJECT AXIOGEN: VECTORIZED MOVEMENT ---
+# One frame of Agent.move for a whole population of the wall worlds: turn,
+# accelerate, clamp, step along the heading and collide every 20x20 body
+# with every wall in one array expression, instead of a pygame.Rect and a
+# collidelist() per agent. Walls come as a raycast.WallSet.
+#
+# Bit-identical to the per-agent code: the body box is truncated to ints the
+# way pygame.Rect truncates floats, boxes overlap under Rect.colliderect's
+# rule, and the first overlapping wall in list order is "the" wall, as with
+# collidelist(). With near (axiocore/broadphase.py) only the walls listed
+# for each agent are tested. Two collision responses:
+#
+#   rebound=None   Stage 2: shoved 3px away from the wall's centre on both
+#                  axes and stopped; friction only while moving freely
+#   rebound=-2     Stages 3/4: stays put with its velocity set to rebound;
+#                  friction every frame
+#
+# Stage-specific consequences (energy, pain, plasticity, boredom) stay in the
+# stages, which get the per-agent hits back.
+
+BODY = 20 # side of an agent's collision box, centred on (x, y)
+
+def collide(x, y, walls, solid=None, near=None):
+    """
+    Index of the first wall each body at (x, y) overlaps, -1 where none.
+    solid: optional (A, W) or (W,) bool mask of the walls each agent can hit.
+    near: optional (A, K) ascending wall indices to test per agent (WallGrid.near).
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if len(walls) == 0: return np.full(len(x), -1, dtype=np.intp)
+    left = np.trunc(x - BODY / 2).astype(np.int64)[:, None]
+    top = np.trunc(y - BODY / 2).astype(np.int64)[:, None]
+    box = walls.bounds(near)
+    if near is not None: box = {name: column[:, 0, :] for name, column in box.items()} # (A, K)
+    overlap = (left < box['x_end']) & (left + BODY > box['x0']) & (top < box['y_end']) & (top + BODY > box['y0'])
+    if solid is not None:
+        if near is not None:
+            solid = np.broadcast_to(np.asarray(solid, dtype=bool), (len(x), len(walls)))
+            solid = np.take_along_axis(np.pad(solid, ((0, 0), (0, 1))), near, axis=1)
+        overlap &= solid
+    first = overlap.argmax(axis=1)
+    if near is not None: first = np.take_along_axis(near, first[:, None], axis=1)[:, 0]
+    return np.where(overlap.any(axis=1), first, -1)
+
+def step(x, y, angle, vel, speed, turn, walls, friction, max_vel, rebound=None, solid=None, grid=None):
+    """
+    Moves A agents by one frame given their network outputs (speed, turn).
+    Returns new (x, y, angle, vel) arrays and the index of the wall each one
+    hit (-1 = moved freely). grid: optional broadphase.WallGrid over walls.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    angle = np.asarray(angle, dtype=float) + np.asarray(turn, dtype=float) * 10
+    vel = np.clip(np.asarray(vel, dtype=float) + np.asarray(speed, dtype=float) * 2, -1, max_vel)
+    rad = np.radians(angle)
+    new_x, new_y = x + np.cos(rad) * vel, y + np.sin(rad) * vel
+    hit = collide(new_x, new_y, walls, solid, None if grid is None else grid.near(new_x, new_y))
+    free = hit < 0
+    if rebound is None:
+        if not free.all():
+            wall = walls.rects[hit] # rows of -1 are masked out below
+            cx, cy = wall[:, 0] + wall[:, 2] // 2, wall[:, 1] + wall[:, 3] // 2
+            new_x = np.where(free, new_x, np.where(x < cx, x - 3, x + 3))
+            new_y = np.where(free, new_y, np.where(y < cy, y - 3, y + 3))
+        x, y = new_x, new_y
+        vel = np.where(free, vel * friction, 0.0)
+    else:
+        x, y = np.where(free, new_x, x), np.where(free, new_y, y)
+        vel = np.where(free, vel, rebound) * friction
+    return x, y, angle, vel, hit
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+from neat.graphs import feed_forward_layers
+
+# --- PROJECT AXIOGEN: IN-PLACE PLASTIC NETWORKS (STAGE 4) ---
+# A feed-forward network whose weights live in one array and can be nudged
+# during the agent's life without rebuilding anything. Evaluation follows
+# neat.nn.FeedForwardNetwork exactly (same layers, same link order, same
+# activation and aggregation functions), so with the same weights it returns
+# the same outputs, bit for bit.
+#
+# Plasticity rules:
+#   'global' - every enabled connection gets weight += random() * factor,
+#              the original Stage 4 rule (same random stream, same results).
+#   'trace'  - the same nudge scaled by each connection's eligibility trace:
+#              a running average of |pre * post| activity, so only synapses
+#              that were recently active learn from a crash or a reward.
+#
+# The genome is untouched until sync() copies the weights back, normally once
+# at the end of the episode.
+
+RULES = ('global', 'trace')
+
+class PlasticNetwork:
+    def __init__(self, genome, config, rule='global', trace_decay=0.9):
+        if rule not in RULES:
+            raise ValueError(f"unknown plasticity rule '{rule}'")
+        gc = config.genome_config
+        self.genome = genome
+        self.rule = rule
+        self.trace_decay = trace_decay
+        self.input_nodes, self.output_nodes = gc.input_keys, gc.output_keys
+
+        # Every enabled connection is plastic, expressed or not (like the genome edit it replaces)
+        self.keys = [cg.key for cg in genome.connections.values() if cg.enabled]
+        self.weights = np.array([genome.connections[key].weight for key in self.keys], dtype=float)
+        self.trace = np.zeros(len(self.keys))
+        index = {key: c for c, key in enumerate(self.keys)}
+
+        self.node_evals = []
+        for layer in feed_forward_layers(self.input_nodes, self.output_nodes, self.keys):
+            for node in layer:
+                links = [(i, index[(i, o)]) for i, o in self.keys if o == node]
+                ng = genome.nodes[node]
+                self.node_evals.append((node, gc.activation_defs.get(ng.activation),
+                                        gc.aggregation_function_defs.get(ng.aggregation),
+                                        ng.bias, ng.response, links))
+        # Expressed connections, for the eligibility traces
+        expressed = [(c, i, node) for node, *_, links in self.node_evals for i, c in links]
+        self.trace_conns = np.array([c for c, _, _ in expressed], dtype=np.intp)
+        self.trace_links = [(i, node) for _, i, node in expressed]
+        self.values = dict((key, 0.0) for key in self.input_nodes + self.output_nodes)
+
+    def activate(self, inputs):
+        if len(self.input_nodes) != len(inputs):
+            raise RuntimeError(f"Expected {len(self.input_nodes)} inputs, got {len(inputs)}")
+        values = self.values
+        for k, v in zip(self.input_nodes, inputs):
+            values[k] = v
+
+        weights = self.weights.tolist()
+        for node, act_func, agg_func, bias, response, links in self.node_evals:
+            s = agg_func([values[i] * weights[c] for i, c in links])
+            values[node] = act_func(bias + response * s)
+
+        if self.rule == 'trace' and self.trace_links:
+            activity = np.abs([values[i] * values[o] for i, o in self.trace_links])
+            decay = self.trace_decay
+            self.trace[self.trace_conns] = np.minimum(decay * self.trace[self.trace_conns] + (1 - decay) * activity, 1.0)
+        return [values[i] for i in self.output_nodes]
+
+    def apply_plasticity(self, factor):
+        """ One plastic update of every enabled connection, in place. """
+        noise = np.array([random.random() for _ in self.keys])
+        if self.rule == 'trace': noise *= self.trace
+        self.weights += noise * factor
+
+    def sync(self):
+        """ Copies the learned weights back into the genome. """
+        for key, weight in zip(self.keys, self.weights.tolist()):
+            self.genome.connections[key].weight = weight
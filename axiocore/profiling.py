@@ -0,0 +1,98 @@
+import cProfile
+import io
+import pstats
+import time
+
+import neat
+
+# --- PROJECT AXIOGEN: HOT-PATH TIMERS ---
+# The simulation loops mark phase boundaries with timer.lap('sense'),
+# timer.lap('activate'), ... Each lap books the time since the previous mark
+# to that phase, so one perf_counter() call per phase is the whole cost.
+# Without --timings the stages use NullTimer, whose methods do nothing.
+#
+# Phases: sense, activate, move, reward, render (drawing and event polling),
+# tick (the 60 FPS limiter). TimingReporter prints the per-generation totals,
+# frames/s and agent-steps/s after each evaluation and can record them into a
+# metrics log. Only the shared arena is timed (workers keep their own timers).
+
+PHASES = ('sense', 'activate', 'move', 'reward', 'render', 'tick')
+
+class NullTimer:
+    def begin_frame(self): pass
+    def lap(self, phase): pass
+    def end_frame(self, agents): pass
+
+class PhaseTimer:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.frames = 0
+        self.agent_steps = 0
+        self.last = time.perf_counter()
+
+    def begin_frame(self):
+        self.last = time.perf_counter()
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.totals[phase] += now - self.last
+        self.last = now
+
+    def end_frame(self, agents):
+        self.frames += 1
+        self.agent_steps += agents
+
+    def summary(self):
+        total = sum(self.totals.values())
+        row = dict(self.totals)
+        row['frames'] = self.frames
+        row['frames_per_s'] = self.frames / total if total else 0.0
+        row['agent_steps_per_s'] = self.agent_steps / total if total else 0.0
+        return row
+
+class TimingReporter(neat.reporting.BaseReporter):
+    """ Prints (and optionally logs) the timer's totals after every evaluation, then resets it. """
+    def __init__(self, timer, log=None):
+        self.timer = timer
+        self.log = log
+        self.generation = 0
+
+    def start_generation(self, generation):
+        self.generation = generation + 1 # same numbering as the stage logs
+
+    def post_evaluate(self, config, population, species, best_genome):
+        row = self.timer.summary()
+        total = sum(row[phase] for phase in PHASES)
+        split = ' '.join(f"{phase} {100 * row[phase] / total:.0f}%" for phase in PHASES if total)
+        print(f" >> Timings: {row['frames']} frames in {total:.2f}s | {row['frames_per_s']:.0f} frames/s | "
+              f"{row['agent_steps_per_s']:.0f} agent-steps/s | {split}")
+        if self.log is not None:
+            self.log.record({'generation': self.generation, **row})
+        self.timer.reset()
+
+def profile_generation(eval_genomes, generation, first=1, prefix='axiogen'):
+    """
+    Wraps a neat fitness function so that the given generation (counting from
+    first) runs under cProfile. Stats go to <prefix>_gen<N>.prof and the top
+    entries are printed.
+    """
+    calls = first - 1
+    def wrapped(genomes, config):
+        nonlocal calls
+        calls += 1
+        if calls != generation: return eval_genomes(genomes, config)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return eval_genomes(genomes, config)
+        finally:
+            profiler.disable()
+            path = f"{prefix}_gen{generation}.prof"
+            profiler.dump_stats(path)
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(15)
+            print(f" >> Profile of generation {generation} saved to {path}\n{out.getvalue()}")
+    return wrapped
@@ -0,0 +1,172 @@
+import math
+
+import numpy as np
+
+# --- PROJECT AXIOGEN: BATCHED RAY CASTING ---
+# Walls are stored as an (W, 4) array of axis-aligned boxes and every ray of
+# every agent is intersected with every wall in one vectorized call, instead
+# of one pygame Rect.clipline per wall per ray per agent. No pygame import:
+# headless workers do not need SDL. Anything indexable as (x, y, w, h)
+# (pygame.Rect, tuples) can be passed in.
+#
+# Two hit models:
+#   'slab'  - analytic slab-method intersection in continuous coordinates.
+#   'pixel' - reproduces Rect.clipline (SDL_IntersectRectAndLine): end points
+#             truncated to ints, integer Cohen-Sutherland clipping, hit point
+#             is the first clipped pixel. Bit-identical to the per-wall loops.
+#   'slab' is continuous geometry, so grazing rays can read a pixel or two
+#   shorter than clipline; use it when parity with the pygame loop is not needed.
+# A wall covers the pixels x .. x + w - 1, i.e. the area [x, x + w) x [y, y + h).
+#
+# With near (candidate wall indices per agent from axiocore/broadphase.py)
+# only those walls are intersected: (A, R, K) work instead of (A, R, W).
+
+FAR = -10 ** 6 # where the padding wall of near lists sits: no ray or body reaches it
+
+TOP, BOTTOM, LEFT, RIGHT = 1, 2, 4, 8
+
+exact_hypot = np.frompyfunc(math.hypot, 2, 1)
+
+class WallSet:
+    def __init__(self, rects):
+        rects = [tuple(r) for r in rects]
+        self.rects = np.array(rects, dtype=np.int64).reshape(-1, 4)
+        x, y, w, h = self.rects.T
+        self.x0, self.y0 = x, y
+        self.x1, self.y1 = x + w - 1, y + h - 1  # last pixel (pixel mode)
+        self.x_end, self.y_end = x + w, y + h     # far edge (slab mode)
+        # The same columns with one padding wall appended, for gathers through near lists
+        pad = lambda a: np.append(a, FAR)
+        self.padded = {'x0': pad(self.x0), 'y0': pad(self.y0), 'x1': pad(self.x1), 'y1': pad(self.y1),
+                       'x_end': pad(self.x_end), 'y_end': pad(self.y_end)}
+
+    def __len__(self):
+        return len(self.rects)
+
+    def bounds(self, near=None):
+        """ {column: array}: (W,) for every wall, or (A, 1, K) for each agent's near walls (len(self) = padding). """
+        if near is None:
+            return {'x0': self.x0, 'y0': self.y0, 'x1': self.x1, 'y1': self.y1, 'x_end': self.x_end, 'y_end': self.y_end}
+        near = np.asarray(near)[:, None, :]
+        return {name: column[near] for name, column in self.padded.items()}
+
+    def cast(self, x, y, angles, length, visible=None, mode='pixel', near=None):
+        """
+        x, y: (A,) ray origins. angles: (A, R) absolute ray angles in radians.
+        visible: optional (A, W) or (W,) bool mask of the walls each agent can
+        see (e.g. the gate only while has_key is False).
+        near: optional (A, K) indices of the walls each agent's rays can reach
+        (WallGrid.near); every wall that can be hit must be listed.
+        Returns (A, R) distances to the nearest visible wall, capped at length.
+        """
+        x = np.asarray(x, dtype=float)[:, None]
+        y = np.asarray(y, dtype=float)[:, None]
+        angles = np.asarray(angles, dtype=float)
+        end_x = x + np.cos(angles) * length
+        end_y = y + np.sin(angles) * length
+        x, y = np.broadcast_to(x, angles.shape), np.broadcast_to(y, angles.shape)
+        walls = self.bounds(near)
+
+        if mode == 'slab':
+            hit, dist = self._slab(x, y, np.cos(angles), np.sin(angles), length, walls)
+        elif mode == 'pixel':
+            hit, dx, dy = self._pixel(x, y, end_x, end_y, walls)
+            dist = np.hypot(dx, dy)
+        else:
+            raise ValueError(f"unknown ray cast mode '{mode}'")
+
+        if visible is not None:
+            visible = np.asarray(visible, dtype=bool)
+            if near is not None:
+                visible = np.broadcast_to(visible, (len(near), len(self)))
+                visible = np.take_along_axis(np.pad(visible, ((0, 0), (0, 1))), np.asarray(near), axis=1)
+            hit &= visible[:, None, :] if visible.ndim == 2 else visible
+        dist = np.where(hit & (dist < length), dist, length)
+        if mode == 'slab' or not dist.size:
+            return dist.min(axis=2, initial=length)
+
+        # np.hypot and math.hypot can disagree in the last bit: redo the winning
+        # hits with math.hypot so readings are bit-identical to the per-wall loop
+        nearest = dist.argmin(axis=2)[..., None]
+        dist = np.take_along_axis(dist, nearest, axis=2)[..., 0]
+        hit = dist < length
+        dx = np.take_along_axis(dx, nearest, axis=2)[..., 0][hit]
+        dy = np.take_along_axis(dy, nearest, axis=2)[..., 0][hit]
+        dist[hit] = exact_hypot(dx, dy).astype(float)
+        return dist
+
+    def _slab(self, x, y, dx, dy, length, walls):
+        """ (A, R, W) hit mask and entry distance along unit rays of the given length. """
+        ox, oy = x[..., None], y[..., None]
+        dx, dy = dx[..., None], dy[..., None]
+        x0, y0, x_end, y_end = walls['x0'], walls['y0'], walls['x_end'], walls['y_end']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tx0, tx1 = (x0 - ox) / dx, (x_end - ox) / dx
+            ty0, ty1 = (y0 - oy) / dy, (y_end - oy) / dy
+        # A ray parallel to a slab is inside it for all t, or never
+        inside_x = (ox >= x0) & (ox < x_end)
+        inside_y = (oy >= y0) & (oy < y_end)
+        tx_near = np.where(dx == 0, np.where(inside_x, -np.inf, np.inf), np.minimum(tx0, tx1))
+        tx_far = np.where(dx == 0, np.where(inside_x, np.inf, -np.inf), np.maximum(tx0, tx1))
+        ty_near = np.where(dy == 0, np.where(inside_y, -np.inf, np.inf), np.minimum(ty0, ty1))
+        ty_far = np.where(dy == 0, np.where(inside_y, np.inf, -np.inf), np.maximum(ty0, ty1))
+        t_near = np.maximum(tx_near, ty_near)
+        t_far = np.minimum(tx_far, ty_far)
+        hit = (t_near <= t_far) & (t_far >= 0) & (t_near <= length)
+        return hit, np.maximum(t_near, 0.0)
+
+    def _pixel(self, sx, sy, ex, ey, walls):
+        """ (A, R, W) hit mask and offset (dx, dy) to the first clipped pixel, like Rect.clipline. """
+        rx1, ry1, rx2, ry2 = walls['x0'], walls['y0'], walls['x1'], walls['y1']
+        shape = np.broadcast_shapes(sx.shape + (1,), rx1.shape)
+        x1 = np.broadcast_to(np.trunc(sx).astype(np.int64)[..., None], shape).copy()
+        y1 = np.broadcast_to(np.trunc(sy).astype(np.int64)[..., None], shape).copy()
+        x2 = np.broadcast_to(np.trunc(ex).astype(np.int64)[..., None], shape)
+        y2 = np.broadcast_to(np.trunc(ey).astype(np.int64)[..., None], shape)
+
+        inside = ((x1 >= rx1) & (x1 <= rx2) & (x2 >= rx1) & (x2 <= rx2) &
+                  (y1 >= ry1) & (y1 <= ry2) & (y2 >= ry1) & (y2 <= ry2))
+        one_side = (((x1 < rx1) & (x2 < rx1)) | ((x1 > rx2) & (x2 > rx2)) |
+                    ((y1 < ry1) & (y2 < ry1)) | ((y1 > ry2) & (y2 > ry2)))
+        todo = ~inside & ~one_side
+        horizontal = todo & (y1 == y2)
+        vertical = todo & ~horizontal & (x1 == x2)
+        general = todo & ~horizontal & ~vertical
+
+        x1 = np.where(horizontal, np.clip(x1, rx1, rx2), x1)
+        y1 = np.where(vertical, np.clip(y1, ry1, ry2), y1)
+
+        # Cohen-Sutherland on the start point only: the end point is clipped
+        # after the start is inside, which can no longer reject the line.
+        code2 = outcode(x2, y2, rx1, ry1, rx2, ry2)
+        rejected = np.zeros(shape, dtype=bool)
+        for _ in range(4):
+            code1 = outcode(x1, y1, rx1, ry1, rx2, ry2)
+            active = general & ~rejected & (code1 != 0)
+            if not active.any(): break
+            rejected |= active & ((code1 & code2) != 0)
+            active &= (code1 & code2) == 0
+            top, bottom = (code1 & TOP) != 0, (code1 & BOTTOM) != 0
+            left, right = (code1 & LEFT) != 0, (code1 & RIGHT) != 0
+            clip_y = top | bottom
+            new_y = np.where(top, ry1, np.where(bottom, ry2, 0))
+            new_x = np.where(left, rx1, np.where(right, rx2, 0))
+            on_y = x1 + c_div((x2 - x1) * (new_y - y1), y2 - y1)
+            on_x = y1 + c_div((y2 - y1) * (new_x - x1), x2 - x1)
+            nx = np.where(clip_y, on_y, new_x)
+            ny = np.where(clip_y, new_y, on_x)
+            x1 = np.where(active, nx, x1)
+            y1 = np.where(active, ny, y1)
+
+        hit = inside | horizontal | vertical | (general & ~rejected)
+        return hit, x1 - sx[..., None], y1 - sy[..., None]
+
+def outcode(x, y, rx1, ry1, rx2, ry2):
+    code = np.where(y < ry1, TOP, np.where(y > ry2, BOTTOM, 0))
+    return code | np.where(x < rx1, LEFT, np.where(x > rx2, RIGHT, 0))
+
+def c_div(a, b):
+    """ Integer division truncating toward zero, like C (0 where b == 0). """
+    safe = np.where(b == 0, 1, b)
+    q = np.abs(a) // np.abs(safe)
+    return np.where(b == 0, 0, np.where((a < 0) != (safe < 0), -q, q))
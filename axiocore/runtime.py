@@ -0,0 +1,138 @@
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+
+import numpy as np
+
+# --- PROJECT AXIOGEN: RUNTIME OPTIONS ---
+# Command line switches shared by every stage's training entry point.
+
+def env_flag(name):
+    """True when the environment variable is set to 1/true/yes."""
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes')
+
+def build_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--headless', action='store_true', default=env_flag('AXIOGEN_HEADLESS'),
+                        help="No window, no drawing, no 60 FPS limiter. Same physics, sensing and rewards.")
+    parser.add_argument('--render', choices=['all', 'sampled', 'champion', 'never'], default='all',
+                        help="all = draw every generation, sampled = every Nth generation, champion = replay the "
+                             "generation's best alone every Nth generation, never = same as --headless.")
+    parser.add_argument('--render-every', type=int, default=10,
+                        help="N for --render sampled/champion.")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Seed the RNG so a run (and its fitness values) can be reproduced.")
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python',
+                        help="python = per-agent loop, numpy = vectorized population engine "
+                             "(Stage 1 swarm, batched wall ray casting and movement in Stages 2-4).")
+    parser.add_argument('--inference', choices=['neat', 'batch', 'batch-exact'], default='neat',
+                        help="neat = one FeedForwardNetwork per genome, batch = whole population in one BatchNetwork call, "
+                             "batch-exact = batch with bit-identical activations.")
+    parser.add_argument('--sensor-table', action='store_true',
+                        help="Stages 3/4: read radars from a precomputed (x, y, heading) table, cached on disk.")
+    parser.add_argument('--table-cell', type=int, default=4,
+                        help="Sensor table position resolution in pixels (smaller = more accurate, bigger table).")
+    parser.add_argument('--table-step', type=float, default=5,
+                        help="Sensor table heading resolution in degrees (must divide the radar offsets).")
+    parser.add_argument('--plasticity', choices=['global', 'trace'], default='global',
+                        help="Stage 4: global = nudge every enabled connection, trace = only recently active ones.")
+    parser.add_argument('--trace-decay', type=float, default=0.9,
+                        help="Stage 4 eligibility trace decay per frame for --plasticity trace.")
+    parser.add_argument('--log-frames', action='store_true',
+                        help="Also log x, y, alive and fitness of every agent every frame (shared arena only).")
+    parser.add_argument('--log-flush', type=float, default=10.0,
+                        help="Seconds between metrics log flushes (logs are buffered in memory in between).")
+    parser.add_argument('--timings', action='store_true',
+                        help="Time the sense/activate/move/reward/render/tick phases and report them every generation.")
+    parser.add_argument('--profile-gen', type=int, default=None, metavar='N',
+                        help="Run generation N under cProfile and save the stats.")
+    parser.add_argument('--stop-window', type=int, default=60,
+                        help="Frames between early-stop reviews of the live agents.")
+    parser.add_argument('--stop-stuck', type=float, default=0,
+                        help="Stop agents that moved less than this many pixels since the last review (0 = off, shared arena only).")
+    parser.add_argument('--stop-hits', type=int, default=0,
+                        help="Stop agents that hit a wall this many times since the last review (0 = off, shared arena only).")
+    parser.add_argument('--stop-cutoff', action='store_true',
+                        help="Stop agents whose best case can no longer reach the generation's reproduction cutoff (shared arena only).")
+    parser.add_argument('--memo', action='store_true',
+                        help="Stage 3: reuse the fitness of genomes already simulated (elites) instead of re-running them.")
+    parser.add_argument('--memo-size', type=int, default=10000,
+                        help="Fitness cache entries kept for --memo (least recently used are evicted).")
+    parser.add_argument('--novelty', type=float, default=0,
+                        help="Stage 2: add W x novelty (mean distance of the final position to past explorers') to fitness, 0 = off (shared arena only).")
+    parser.add_argument('--novelty-k', type=int, default=15,
+                        help="Nearest archived behaviours averaged for --novelty.")
+    parser.add_argument('--novelty-size', type=int, default=100000,
+                        help="Behaviours kept in the --novelty archive (oldest are evicted).")
+    parser.add_argument('--world', default=None, metavar='XML',
+                        help="Stage 2: train in this world file instead of world_maze.xml "
+                             "(e.g. world_labyrinth.xml, a large procedural labyrinth).")
+    parser.add_argument('--live', type=int, default=None, metavar='PORT',
+                        help="Stream per-generation stats to viewers on this port (python -m axiocore.live --port PORT).")
+    parser.add_argument('--live-host', default='127.0.0.1',
+                        help="Address the --live server binds (default: this machine only; use an SSH tunnel).")
+    parser.add_argument('--checkpoint-every', type=int, default=10,
+                        help="Save the full population (species, RNG, ...) every N generations, 0 = never.")
+    parser.add_argument('--resume', nargs='?', const='auto', default=None, metavar='CHECKPOINT',
+                        help="Continue from a checkpoint (default: this stage's latest).")
+    parser.add_argument('--arena', choices=['shared', 'independent'], default='shared',
+                        help="shared = whole population in one world, independent = one seeded world per genome (parallel).")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for --arena independent (default: all cores).")
+    return parser
+
+def defaults():
+    """ The options a stage runs with when run() is called without command line args. """
+    return build_parser('').parse_args([])
+
+def seed_everything(seed):
+    """Seeds every RNG the simulation touches. Call before building the world/population."""
+    if seed is None: return
+    random.seed(seed)
+    np.random.seed(seed)
+
+def renders(options, generation):
+    """ Whether this generation is evaluated on screen. All others take the headless path. """
+    if options.headless or options.render in ('never', 'champion'): return False
+    return options.render == 'all' or generation % options.render_every == 0
+
+def replays_champion(options, generation):
+    """ Whether the generation's best genome is replayed alone on screen after evaluation. """
+    return not options.headless and options.render == 'champion' and generation % options.render_every == 0
+
+@contextlib.contextmanager
+def preserved_rng():
+    """ Runs a block (e.g. a champion replay) without disturbing the training random streams. """
+    state, np_state = random.getstate(), np.random.get_state()
+    try:
+        yield
+    finally:
+        random.setstate(state)
+        np.random.set_state(np_state)
+
+@contextlib.contextmanager
+def swapped(namespace, **values):
+    """ Rebinds names in a namespace (a stage's globals()) for the length of a block, then restores them. """
+    saved = {name: namespace[name] for name in values}
+    namespace.update(values)
+    try:
+        yield
+    finally:
+        namespace.update(saved)
+
+@contextlib.contextmanager
+def atomic_write(path):
+    """
+    Opens a temp file next to path for binary writing and renames it over path
+    on success, so readers (and a crash) never see a half-written file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
@@ -0,0 +1,97 @@
+import hashlib
+import os
+
+import numpy as np
+
+from axiocore import raycast, runtime
+
+# --- PROJECT AXIOGEN: PRECOMPUTED SENSOR TABLES (STAGES 3/4) ---
+# The Stage 3/4 worlds never change: same walls, same gate, same switch and
+# goal every generation. Only the gate's solidity depends on has_key. So the
+# radar distance of every ray can be computed once for a grid of positions
+# and headings, for both gate states, and sensing becomes a table lookup.
+#
+# The table holds one distance per (gate state, x cell, y cell, heading step).
+# The 5 radars of an agent are 5 lookups at heading + radar offset, so the
+# offsets must be multiples of the heading step. Positions snap to the centre
+# of their cell and headings to the nearest step: cell (px) and step (deg)
+# trade table size and build time against sensing error.
+#
+# Tables are cached on disk as .npy files named after a hash of the world
+# geometry and the resolution, and memory-mapped when loaded, so worker
+# processes share the pages instead of each holding a copy.
+
+GATE_CLOSED, GATE_OPEN = 0, 1
+VERSION = 1
+
+_loaded = {}  # path -> SensorTable, one mapping per process
+
+class SensorTable:
+    def __init__(self, data, cell, step, offsets):
+        self.data = data  # (2, nx, ny, nh) float32
+        self.cell, self.step = cell, step
+        self.nx, self.ny, self.nh = data.shape[1:]
+        offsets = np.asarray(offsets, dtype=float) / step
+        if not np.allclose(offsets, np.rint(offsets)):
+            raise ValueError(f"radar offsets must be multiples of the heading step ({step} deg)")
+        self.offsets = np.rint(offsets).astype(np.intp)
+
+    def lookup(self, x, y, angle, has_key):
+        """
+        x, y, angle (degrees), has_key: (A,) agent states. Returns (A, R)
+        radar distances at the table resolution.
+        """
+        ix = np.clip((np.asarray(x, dtype=float) // self.cell).astype(np.intp), 0, self.nx - 1)
+        iy = np.clip((np.asarray(y, dtype=float) // self.cell).astype(np.intp), 0, self.ny - 1)
+        ih = np.rint(np.asarray(angle, dtype=float) / self.step).astype(np.intp)
+        heading = (ih[:, None] + self.offsets) % self.nh
+        gate = np.asarray(has_key, dtype=np.intp)
+        return self.data[gate[:, None], ix[:, None], iy[:, None], heading].astype(float)
+
+def geometry_hash(walls, gate, width, height, length, cell, step):
+    """ Cache key: everything the table depends on. """
+    h = hashlib.sha1()
+    h.update(np.array([tuple(w) for w in walls] + [tuple(gate)], dtype=np.int64).tobytes())
+    h.update(np.array([width, height, length, cell, step, VERSION], dtype=float).tobytes())
+    return h.hexdigest()
+
+def build(walls, gate, width, height, length, cell, step, chunk=2000):
+    """ Casts every ray of the grid against walls + gate. Returns (2, nx, ny, nh) float32. """
+    if 360 % step:
+        raise ValueError(f"heading step must divide 360 degrees (got {step})")
+    nx, ny, nh = int(np.ceil(width / cell)), int(np.ceil(height / cell)), int(360 // step)
+    walls = raycast.WallSet(list(walls) + [gate])
+    data = np.empty((2, nx, ny, nh), dtype=np.float32)
+
+    # One "agent" per cell centre, with nh rays
+    gx, gy = np.meshgrid((np.arange(nx) + 0.5) * cell, (np.arange(ny) + 0.5) * cell, indexing='ij')
+    gx, gy = gx.ravel(), gy.ravel()
+    angles = np.radians(np.arange(nh) * step)
+    for state in (GATE_CLOSED, GATE_OPEN):
+        visible = np.ones(len(walls), dtype=bool)
+        visible[-1] = state == GATE_CLOSED
+        flat = data[state].reshape(nx * ny, nh)
+        for i in range(0, len(gx), chunk):
+            xs, ys = gx[i:i + chunk], gy[i:i + chunk]
+            rays = np.broadcast_to(angles, (len(xs), nh))
+            flat[i:i + chunk] = walls.cast(xs, ys, rays, length, visible)
+    return data
+
+def load(walls, gate, width, height, length=150, offsets=(-45, -20, 0, 20, 45), cell=4, step=5, cache_dir='.'):
+    """
+    The SensorTable for this geometry: memory-mapped from cache_dir when a
+    table with the same hash exists there, otherwise built and saved first.
+    """
+    key = geometry_hash(walls, gate, width, height, length, cell, step)
+    path = os.path.join(cache_dir, f"axiogen_sensors_{key[:16]}.npy")
+    if path in _loaded: return _loaded[path]
+
+    if not os.path.exists(path):
+        data = build(walls, gate, width, height, length, cell, step)
+        with runtime.atomic_write(path) as f: # a crash never leaves half a table behind
+            np.save(f, data)
+        print(f" >> Sensor table built: {path} ({data.nbytes / 2**20:.1f} MB, {cell}px / {step} deg)")
+
+    table = SensorTable(np.load(path, mmap_mode='r'), cell, step, offsets)
+    _loaded[path] = table
+    return table
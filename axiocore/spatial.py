@@ -0,0 +1,99 @@
+import math
+
+# --- PROJECT AXIOGEN: SPATIAL HASH ---
+# Uniform grid over point entities (food, goals). Each cell keeps the keys of
+# the entities inside it, so insert/remove/move are O(1) and a radius or cone
+# query only visits the cells under its bounding box: the cost follows local
+# density, not the total number of entities in the world.
+#
+# The *_candidates queries return everything in the visited cells (a superset)
+# so callers can keep their own exact hit test and get results identical to a
+# full scan. query_radius/query_cone apply the exact test themselves.
+
+class SpatialHash:
+    def __init__(self, cell_size=50):
+        self.cell_size = cell_size
+        self.cells = {}  # (cx, cy) -> set of keys
+        self.items = {}  # key -> (x, y, cell)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, key, x, y):
+        cell = self._cell(x, y)
+        self.cells.setdefault(cell, set()).add(key)
+        self.items[key] = (x, y, cell)
+
+    def remove(self, key):
+        _, _, cell = self.items.pop(key)
+        bucket = self.cells[cell]
+        bucket.discard(key)
+        if not bucket: del self.cells[cell]
+
+    def move(self, key, x, y):
+        cell = self._cell(x, y)
+        if self.items[key][2] == cell:
+            self.items[key] = (x, y, cell)
+        else:
+            self.remove(key)
+            self.insert(key, x, y)
+
+    def position(self, key):
+        x, y, _ = self.items[key]
+        return x, y
+
+    def box_candidates(self, x0, y0, x1, y1):
+        """ Keys in every cell overlapping the box [x0, x1] x [y0, y1]. """
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Box is bigger than the occupied grid: walk the occupied cells instead
+            for (cx, cy), bucket in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1: yield from bucket
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket: yield from bucket
+
+    def radius_candidates(self, x, y, r):
+        return self.box_candidates(x - r, y - r, x + r, y + r)
+
+    def cone_candidates(self, x, y, angle, half_width, r):
+        """ Keys in the cells under the cone (apex x, y; heading angle in radians). """
+        if half_width >= math.pi: return self.radius_candidates(x, y, r)
+        lo, hi = angle - half_width, angle + half_width
+        xs = [x, x + math.cos(lo) * r, x + math.cos(hi) * r]
+        ys = [y, y + math.sin(lo) * r, y + math.sin(hi) * r]
+        # The arc bulges past its end points wherever it crosses an axis direction
+        k = math.ceil(lo / (math.pi / 2))
+        while k * (math.pi / 2) <= hi:
+            xs.append(x + math.cos(k * math.pi / 2) * r)
+            ys.append(y + math.sin(k * math.pi / 2) * r)
+            k += 1
+        pad = 1.0  # guards the box edges against rounding
+        return self.box_candidates(min(xs) - pad, min(ys) - pad, max(xs) + pad, max(ys) + pad)
+
+    def query_radius(self, x, y, r):
+        """ Keys strictly closer than r. """
+        found = []
+        for key in self.radius_candidates(x, y, r):
+            ex, ey, _ = self.items[key]
+            if math.hypot(ex - x, ey - y) < r: found.append(key)
+        return found
+
+    def query_cone(self, x, y, angle, half_width, r):
+        """ Keys closer than r whose bearing is within half_width of angle. """
+        found = []
+        for key in self.cone_candidates(x, y, angle, half_width, r):
+            ex, ey, _ = self.items[key]
+            if math.hypot(ex - x, ey - y) >= r: continue
+            diff = (math.atan2(ey - y, ex - x) - angle + math.pi) % (2 * math.pi) - math.pi
+            if abs(diff) < half_width: found.append(key)
+        return found
@@ -0,0 +1,78 @@
+import copy
+import itertools
+
+import neat
+
+# --- PROJECT AXIOGEN: TRANSFER SEEDING ---
+# Every stage starts from the previous stage's brain, but the input layer
+# grows along the way: 5 radars (Stages 1-2), + key/goal senses (10, Stage 3),
+# + pain and energy (12, Stage 4). adapt_inputs() maps the old input nodes
+# onto the new layout explicitly; by default old input i stays input i and
+# the new inputs start unconnected, so the transferred brain behaves exactly
+# as before until mutation wires the new senses in. With new_weight set, each
+# new input is instead connected to every output with that fixed weight.
+#
+# seeded_population() builds the whole first generation from that brain in
+# one pass: shallow gene copies instead of deepcopy, no throwaway random
+# population, and a single speciation.
+
+def clone(genome, key):
+    """ A copy of genome under a new key. Genes only hold numbers and strings, so shallow copies suffice. """
+    new = genome.__class__(key)
+    new.nodes = {k: copy.copy(gene) for k, gene in genome.nodes.items()}
+    new.connections = {k: copy.copy(gene) for k, gene in genome.connections.items()}
+    return new
+
+def adapt_inputs(genome, config, num_inputs=None, mapping=None, new_weight=None):
+    """
+    A clone of genome rewired for config's input layer. num_inputs is the
+    genome's original input count (default: inferred from its connections).
+    mapping: {old input key: new input key}, default -i -> -i for the inputs
+    both layouts share. Connections from unmapped old inputs are dropped.
+    """
+    gc = config.genome_config
+    missing = [k for k in gc.output_keys if k not in genome.nodes]
+    if missing:
+        raise ValueError(f"genome has no output node(s) {missing}: transfer keeps the output layer")
+    if num_inputs is None:
+        num_inputs = max((-i for i, _ in genome.connections if i < 0), default=0)
+    if mapping is None:
+        mapping = {-k - 1: -k - 1 for k in range(min(num_inputs, gc.num_inputs))}
+
+    adapted = clone(genome, genome.key)
+    connections = {}
+    for (i, o), gene in adapted.connections.items():
+        if i < 0:
+            if i not in mapping: continue
+            i = mapping[i]
+            gene.key = (i, o)
+        connections[(i, o)] = gene
+    if new_weight is not None:
+        for i in gc.input_keys:
+            if i in mapping.values(): continue
+            for o in gc.output_keys:
+                if (i, o) in connections: continue
+                gene = gc.connection_gene_type((i, o))
+                gene.weight, gene.enabled = new_weight, True
+                connections[(i, o)] = gene
+    adapted.connections = connections
+    return adapted
+
+def seeded_population(config, genome, mutate=True, **adapt):
+    """
+    A neat.Population of config.pop_size mutated clones of genome (adapted
+    to config's inputs, see adapt_inputs), speciated once.
+    """
+    base = adapt_inputs(genome, config, **adapt)
+    population = {}
+    for key in range(1, config.pop_size + 1):
+        g = clone(base, key)
+        if mutate: g.mutate(config.genome_config)
+        population[key] = g
+
+    p = neat.Population(config, (population, None, 0))
+    p.species = config.species_set_type(config.species_set_config, p.reporters)
+    p.species.speciate(config, p.population, p.generation)
+    p.reproduction.genome_indexer = itertools.count(config.pop_size + 1)
+    p.reproduction.ancestors = {key: tuple() for key in population}
+    return p
@@ -0,0 +1,118 @@
+import hashlib
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pygame
+
+from axiocore import raycast
+
+# --- PROJECT AXIOGEN: WORLD FILES ---
+# One declarative XML format for every world (Stage 1's world_alpha.xml is a
+# valid one). load() parses a file once, compiles it into arrays and caches
+# the result by the file's content hash, so every generation (and every
+# forked worker) reuses the same geometry and ray-cast tables instead of
+# rebuilding them.
+#
+#   <world width="800" height="600">
+#       <physics friction="0.92" />
+#       <walls border="15">               border: the four frame walls, in
+#           <wall x="390" y="0" w="20" h="250" />   top, bottom, left, right order
+#       </walls>
+#       <gate x="390" y="250" w="20" h="100" />     solid until the key is found
+#       <switch x="100" y="100" />                  the key
+#       <goal x="700" y="300" />
+#       <spawn food="40" margin="20" />             random food, drawn by the stage
+#       <maze walls="12" length="60,200" x="100,600" y="100,400" thickness="20" />
+#       <labyrinth cell="60" thickness="8" loops="0.1" />  random rooms inside the border
+#       <start x="400" y="300" />                   where agents spawn
+#       <entities>                                  fixed food and round obstacles
+#           <food x="100" y="100" energy="50" />
+#           <obstacle x="300" y="200" radius="40" />
+#       </entities>
+#   </world>
+#
+# Randomized parts (spawn, maze, labyrinth) are only described here: the
+# stages draw them from their own random stream, in the same order as before
+# (labyrinths are built by axiocore/mazegen.py).
+
+_cache = {}
+
+def ints(text):
+    return tuple(int(v) for v in text.split(','))
+
+class WorldSpec:
+    """ A compiled world file. Arrays are shared by everyone: treat them as read-only. """
+    def __init__(self, root, digest):
+        self.hash = digest
+        self.width = int(root.get('width', 800))
+        self.height = int(root.get('height', 600))
+        physics = root.find('physics')
+        self.friction = float(physics.get('friction', 0.95)) if physics is not None else 0.95
+
+        walls = []
+        node = root.find('walls')
+        self.border = 0 if node is None else int(node.get('border', 0))
+        if node is not None:
+            b = self.border
+            if b:
+                w, h = self.width, self.height
+                walls += [(0, 0, w, b), (0, h - b, w, b), (0, 0, b, h), (w - b, 0, b, h)]
+            walls += [tuple(int(wall.get(k)) for k in 'xywh') for wall in node.iter('wall')]
+        self.walls = np.array(walls, dtype=np.int32).reshape(-1, 4)
+        self.gate = self.rect_of(root.find('gate'))
+        self.switch = self.point_of(root.find('switch'))
+        self.goal = self.point_of(root.find('goal'))
+        self.start = self.point_of(root.find('start'))
+
+        entities = root.find('entities')
+        entities = [] if entities is None else list(entities)
+        self.foods = np.array([[int(e.get(k)) for k in ('x', 'y', 'energy')] for e in entities if e.tag == 'food'],
+                              dtype=np.int32).reshape(-1, 3)
+        self.obstacles = np.array([[int(e.get(k)) for k in ('x', 'y', 'radius')] for e in entities
+                                   if e.tag == 'obstacle'], dtype=np.int32).reshape(-1, 3)
+
+        spawn = root.find('spawn')
+        self.spawn_food = None if spawn is None else (int(spawn.get('food')), int(spawn.get('margin', 0)))
+        maze = root.find('maze')
+        self.maze = None if maze is None else {
+            'walls': int(maze.get('walls')), 'length': ints(maze.get('length')),
+            'x': ints(maze.get('x')), 'y': ints(maze.get('y')), 'thickness': int(maze.get('thickness')),
+        }
+        labyrinth = root.find('labyrinth')
+        self.labyrinth = None if labyrinth is None else {
+            'cell': int(labyrinth.get('cell')), 'thickness': int(labyrinth.get('thickness')),
+            'loops': float(labyrinth.get('loops', 0)),
+        }
+        self._wall_tuples = [tuple(w) for w in self.walls.tolist()]
+        self._wall_sets = {}
+
+    @staticmethod
+    def rect_of(node):
+        return None if node is None else tuple(int(node.get(k)) for k in 'xywh')
+
+    @staticmethod
+    def point_of(node):
+        return None if node is None else (int(node.get('x')), int(node.get('y')))
+
+    def wall_rects(self):
+        """ A fresh list of pygame.Rect walls (the caller may append to it). """
+        return [pygame.Rect(w) for w in self._wall_tuples]
+
+    def gate_rect(self):
+        return None if self.gate is None else pygame.Rect(self.gate)
+
+    def wall_set(self, with_gate=False):
+        """ The raycast.WallSet of the fixed walls (gate last with with_gate), built once. """
+        if with_gate not in self._wall_sets:
+            rects = self._wall_tuples + ([self.gate] if with_gate else [])
+            self._wall_sets[with_gate] = raycast.WallSet(rects)
+        return self._wall_sets[with_gate]
+
+def load(path):
+    """ The compiled world in path, from the cache when a file with the same content was loaded before. """
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+    if digest not in _cache:
+        _cache[digest] = WorldSpec(ET.fromstring(data), digest)
+    return _cache[digest]
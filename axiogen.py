@@ -1,37 +1,23 @@
 import pygame
-import xml.etree.ElementTree as ET
 import sys
+import os
 import math
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from axiocore import worlds
+
 # --- PROJECT AXIOGEN: WORLD LOADER v0.2 ---
 
 class World:
     def __init__(self, xml_file):
-        self.tree = ET.parse(xml_file)
-        self.root = self.tree.getroot()
-        self.width = int(self.root.get('width', 800))
-        self.height = int(self.root.get('height', 600))
+        spec = worlds.load(xml_file) # compiled once, cached by content hash
+        self.width, self.height = spec.width, spec.height
         
         # Physics settings
-        physics_params = self.root.find('physics')
-        self.friction = float(physics_params.get('friction', 0.95))
-        
-        self.foods = []
-        self.obstacles = []
+        self.friction = spec.friction
         
-        for entity in self.root.find('entities'):
-            if entity.tag == 'food':
-                self.foods.append({
-                    'x': int(entity.get('x')), 
-                    'y': int(entity.get('y')), 
-                    'energy': int(entity.get('energy'))
-                })
-            elif entity.tag == 'obstacle':
-                self.obstacles.append({
-                    'x': int(entity.get('x')), 
-                    'y': int(entity.get('y')), 
-                    'radius': int(entity.get('radius'))
-                })
+        self.foods = [dict(zip(('x', 'y', 'energy'), f)) for f in spec.foods.tolist()]
+        self.obstacles = [dict(zip(('x', 'y', 'radius'), o)) for o in spec.obstacles.tolist()]
 
 class Agent:
     def __init__(self, x, y):
@@ -4,43 +4,50 @@ import math
 import neat
 import os
 import random
-import pickle
-import csv
 import datetime
+import glob
+import pickle
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from axiocore import runtime, spatial, genomeio, metrics, parallel, worlds
 
 # --- PROJECT AXIOGEN: UNIVERSITY (V3 - METABOLIC TEST) ---
 
 timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 log_filename = f"university_report_{timestamp}.csv"
 
+PLANET_FILES = ['planet_harvester.xml', 'planet_snake.xml', 'planet_hunter.xml']
+
 class World:
     def __init__(self, mode):
-        self.width, self.height = 800, 600
+        spec = worlds.load(os.path.join(os.path.dirname(os.path.abspath(__file__)), PLANET_FILES[mode]))
+        self.width, self.height = spec.width, spec.height
         self.mode = mode # 0: Harvester, 1: Snake, 2: Hunter
-        self.walls = []
-        self.foods = []
-        self.goal_pos = [700, 300]
-        self.setup_environment()
-
-    def setup_environment(self):
-        # Global Borders
-        self.walls = [
-            pygame.Rect(0, 0, 800, 15), pygame.Rect(0, 585, 800, 15),
-            pygame.Rect(0, 0, 15, 600), pygame.Rect(785, 0, 15, 600)
-        ]
-        
-        if self.mode == 0: # HARVESTER
-            for _ in range(50):
-                self.foods.append([random.randint(50, 750), random.randint(50, 550)])
-        
-        elif self.mode == 1: # THE SNAKE
-            self.walls.append(pygame.Rect(0, 150, 600, 25))
-            self.walls.append(pygame.Rect(200, 350, 600, 25))
-            self.goal_pos = [100, 500]
+        self.walls = spec.wall_rects() # Global Borders (+ the Snake's two walls)
+        self.foods = {} # food id -> [x, y], in spawn order (first = current target)
+        self.food_index = spatial.SpatialHash(cell_size=50)
+        self.goal_pos = list(spec.goal)
+        self.setup_environment(spec)
 
-        elif self.mode == 2: # THE HUNTER
+    def setup_environment(self, spec):
+        if spec.spawn_food: # HARVESTER
+            count, margin = spec.spawn_food
+            for i in range(count):
+                self.foods[i] = [random.randint(margin, self.width - margin), random.randint(margin, self.height - margin)]
+                self.food_index.insert(i, *self.foods[i])
+
+        if self.mode == 2: # THE HUNTER
             self.goal_pos = [random.randint(100, 700), random.randint(100, 500)]
 
+    def first_food(self):
+        return next(iter(self.foods.values()), None)
+
+    def eat_food(self, key):
+        del self.foods[key]
+        self.food_index.remove(key)
+
     def update_hunter(self, frame):
         if self.mode == 2 and frame % 120 == 0:
             self.goal_pos = [random.randint(100, 700), random.randint(100, 500)]
@@ -76,7 +83,7 @@ class Agent:
                 if clip: d = min(d, math.hypot(clip[0][0]-self.x, clip[0][1]-self.y))
             radars.append(d)
 
-        target = world.goal_pos if world.mode != 0 else (world.foods[0] if world.foods else [400,300])
+        target = world.goal_pos if world.mode != 0 else (world.first_food() or [400,300])
         dist_t = math.hypot(target[0]-self.x, target[1]-self.y)
         ang_t = math.atan2(target[1]-self.y, target[0]-self.x) - math.radians(self.angle)
         
@@ -114,40 +121,39 @@ class Agent:
 
         # 4. SCORING & REFUELING
         if world.mode == 0: # Harvester
-            for f in world.foods[:]:
-                if math.hypot(f[0]-self.x, f[1]-self.y) < 25:
-                    world.foods.remove(f)
-                    self.score += 1
-                    self.energy = min(self.max_energy, self.energy + 250) # Refuel!
+            for key in world.food_index.query_radius(self.x, self.y, 25):
+                world.eat_food(key)
+                self.score += 1
+                self.energy = min(self.max_energy, self.energy + 250) # Refuel!
         else: # Snake and Hunter
             if dist_t < 35:
                 self.score += 1
                 self.energy = min(self.max_energy, self.energy + 500) # Refuel!
                 if world.mode == 2: world.update_hunter(120)
 
-def run_test():
-    pygame.init()
-    screen = pygame.display.set_mode((800, 600))
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 20)
-
-    try:
-        with open('stage4_brain.pkl', 'rb') as f:
-            brain_genome = pickle.load(f)
-    except:
-        print("Error: stage4_brain.pkl not found in this folder!")
-        return
+def run_test(headless=False, seed=None):
+    runtime.seed_everything(seed)
+    if not headless:
+        pygame.init()
+        screen = pygame.display.set_mode((800, 600))
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 20)
 
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, 'config-feedforward.txt')
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                                 neat.DefaultSpeciesSet, neat.DefaultStagnation, config_path)
 
+    try:
+        brain_genome = genomeio.load_brain('stage4_brain', config) # stage4_brain.axg, else .pkl
+    except:
+        print("Error: stage4_brain.axg / stage4_brain.pkl not found in this folder!")
+        return
+
     results = []
     modes = ["PLANET A: HARVESTER", "PLANET B: SNAKE", "PLANET C: HUNTER"]
     
-    with open(log_filename, mode='w', newline='') as f:
-        csv.writer(f).writerow(["Planet", "Final Score", "Survival"])
+    report = metrics.MetricsLog(csv_path=log_filename, flush_seconds=0) # a row per planet, written as it ends
 
     for m_idx in range(3):
         world = World(m_idx)
@@ -156,17 +162,22 @@ def run_test():
         run_planet = True
         frame = 0
         while run_planet and frame < 1500:
-            screen.fill((5, 5, 10))
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+            if not headless:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT: pygame.quit(); sys.exit()
 
             world.update_hunter(frame)
             agent.drive(world)
+            frame += 1
+            if not agent.alive: run_planet = False
+            if headless: continue
+
+            screen.fill((5, 5, 10))
 
             # Draw Walls
             for w in world.walls: pygame.draw.rect(screen, (60, 60, 80), w)
             # Draw Food/Goal
-            for f in world.foods: pygame.draw.circle(screen, (255, 255, 0), f, 5)
+            for f in world.foods.values(): pygame.draw.circle(screen, (255, 255, 0), f, 5)
             if world.mode != 0: pygame.draw.circle(screen, (0, 255, 100), world.goal_pos, 20)
             
             # Draw Agent (Color shows Energy level)
@@ -184,19 +195,123 @@ def run_test():
 
             pygame.display.flip()
             clock.tick(60)
-            frame += 1
-            if not agent.alive: run_planet = False
 
         # Results
         status = "GRADUATED" if agent.alive and agent.score > 0 else "FAILED"
         results.append([modes[m_idx], agent.score, status])
-        with open(log_filename, mode='a', newline='') as f:
-            csv.writer(f).writerow([modes[m_idx], agent.score, status])
+        report.record({"Planet": modes[m_idx], "Final Score": agent.score, "Survival": status})
+    report.close()
 
     print("\n--- AXIOGEN UNIVERSITY: DIPLOMA REPORT ---")
     for r in results:
         print(f"{r[0]}: Score {r[1]} | {r[2]}")
-    pygame.quit()
+    if not headless: pygame.quit()
+
+# --- BATCH EXAMS: many brains x K seeded layouts per planet, headless, over a process pool ---
+PLANETS = ["PLANET A: HARVESTER", "PLANET B: SNAKE", "PLANET C: HUNTER"]
+exam_config = None
+
+def sit_exam(genome, config, mode, seed):
+    """ One headless exam on planet `mode`, its layout (food, hunter goals) drawn from seed. Returns (score, survived). """
+    random.seed(seed)
+    world = World(mode)
+    agent = Agent(400, 500, genome, config)
+    frame = 0
+    while frame < 1500 and agent.alive:
+        world.update_hunter(frame)
+        agent.drive(world)
+        frame += 1
+    return agent.score, agent.alive
+
+def grade_brain(name, genome, seeds):
+    """ All planets x seeds for one brain. Returns one summary row per planet. """
+    rows = []
+    for m_idx, planet in enumerate(PLANETS):
+        results = [sit_exam(genome, exam_config, m_idx, seed) for seed in seeds]
+        scores = np.array([score for score, _ in results], dtype=float)
+        survived = np.array([alive for _, alive in results], dtype=float)
+        graduated = np.array([alive and score > 0 for score, alive in results], dtype=float)
+        rows.append({"Brain": name, "Planet": planet, "Exams": len(seeds),
+                     "Mean Score": scores.mean(), "Score Variance": scores.var(),
+                     "Survival Rate": survived.mean(), "Survival Variance": survived.var(),
+                     "Graduation Rate": graduated.mean()})
+    return rows
+
+def _grade_job(job):
+    return grade_brain(*job)
+
+def _init_exam_worker(config):
+    global exam_config
+    exam_config = config
+
+def load_brains(directory, config):
+    """ (name, genome) for every brain in directory: each genome of every .axg archive, and genome .pkl files. """
+    brains = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.axg')) + glob.glob(os.path.join(directory, '*.pkl'))):
+        name = os.path.basename(path)
+        try:
+            if path.endswith('.axg'):
+                archive = genomeio.GenomeArchive(path)
+                for i in range(len(archive)):
+                    brains.append((name if len(archive) == 1 else f"{name}#{i}", archive.genome(i, config)))
+            else:
+                with open(path, 'rb') as f:
+                    genome = pickle.load(f)
+                if not isinstance(genome, neat.DefaultGenome): raise ValueError("not a genome")
+                brains.append((name, genome))
+        except Exception as e:
+            print(f" >> Skipping {name}: {e}")
+    return brains
+
+def run_exams(directory, exams=10, seed=None, workers=None, report_path=None):
+    """
+    Grades every brain in directory on `exams` seeded layouts per planet (the
+    same layouts for every brain) and writes one summary row per brain and
+    planet to a single CSV report.
+    """
+    global exam_config
+    local_dir = os.path.dirname(__file__)
+    exam_config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                     neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                     os.path.join(local_dir, 'config-feedforward.txt'))
+    brains = load_brains(directory, exam_config)
+    if not brains:
+        print(f"Error: no brains (.axg / .pkl) found in {directory}")
+        return []
+    base = 0 if seed is None else seed
+    seeds = [base + k for k in range(exams)]
+    jobs = [(name, genome, seeds) for name, genome in brains]
+    print(f" >> Grading {len(brains)} brains x {len(PLANETS)} planets x {exams} layouts...")
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        with parallel.pool_context().Pool(workers, initializer=_init_exam_worker, initargs=(exam_config,)) as pool:
+            graded = pool.map(_grade_job, jobs, chunksize=1)
+    else:
+        graded = [_grade_job(job) for job in jobs]
+
+    report = metrics.MetricsLog(csv_path=report_path or f"university_exams_{timestamp}.csv")
+    rows = [row for brain_rows in graded for row in brain_rows]
+    for row in rows: report.record(row)
+    report.close()
+
+    # Leaderboard: graduation rate over all planets, then mean score
+    ranking = sorted(graded, key=lambda r: (sum(p["Graduation Rate"] for p in r), sum(p["Mean Score"] for p in r)),
+                     reverse=True)
+    print("\n--- AXIOGEN UNIVERSITY: CLASS RANKING ---")
+    for brain_rows in ranking[:10]:
+        marks = " | ".join(f"{p['Planet'].split(': ')[1]} {p['Graduation Rate']:.0%} ({p['Mean Score']:.1f})"
+                           for p in brain_rows)
+        print(f"{brain_rows[0]['Brain']}: {marks}")
+    print(f" >> Report saved to {report.csv_path}")
+    return rows
 
 if __name__ == "__main__":
-    run_test()
\ No newline at end of file
+    parser = runtime.build_parser("AXIOGEN University: generalization exam")
+    parser.add_argument('--brains', default=None, metavar='DIR',
+                        help="Grade every brain in DIR (headless, in parallel) instead of stage4_brain.")
+    parser.add_argument('--exams', type=int, default=10, help="Seeded layouts per planet for --brains.")
+    parser.add_argument('--report', default=None, help="Report file for --brains (default: university_exams_<time>.csv).")
+    args = parser.parse_args()
+    if args.brains: run_exams(args.brains, args.exams, args.seed, args.workers, args.report)
+    else: run_test(args.headless, args.seed)
\ No newline at end of file
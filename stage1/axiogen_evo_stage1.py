@@ -2,15 +2,18 @@
 # Trotsky Protocol: Hunger is constant. Stagnation is death.
 # Continued Revolution: The goalpost moves immediately!
 import pygame
-import xml.etree.ElementTree as ET
 import sys
 import math
 import neat
 import os
 import random
 import pickle
-import csv
 import datetime
+import copy
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from axiocore import runtime, foraging, batchnet, parallel, spatial, checkpoint, genomeio, metrics, profiling, earlystop, worlds, live
 
 # --- PROJECT AXIOGEN: STAGE 1 (FAIL-SAFE EDITION) ---
 
@@ -18,35 +21,40 @@ timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 log_filename = f"axiogen_stage1_{timestamp}.csv"
 # We use a constant filename for the autosave so it updates every gen
 autosave_filename = f"axiogen_stage1_AUTOSAVE.pkl" 
+brain_filename = f"axiogen_stage1_AUTOSAVE.axg" # same brain, compact format (axiocore/genomeio.py)
+checkpoint_filename = f"axiogen_stage1_CHECKPOINT.pkl.gz" # full population, see --resume
 
-with open(log_filename, mode='w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Generation", "Max Fitness", "Avg Fitness", "Alive Count"])
+# Buffered logs (axiocore/metrics.py): nothing is written before the first flush
+generation_log = metrics.MetricsLog(f"axiogen_stage1_{timestamp}.axm", csv_path=log_filename)
+frame_log = None # per-frame, per-agent telemetry (--log-frames)
+timer = profiling.NullTimer() # --timings swaps in a PhaseTimer
+early_stop = None # earlystop.EarlyStop with --stop-*
 
 print("--- STAGE 1: FAIL-SAFE PROTOCOL ---")
 print(f" > Model will AUTO-SAVE every generation to: {autosave_filename}")
 
 class World:
     def __init__(self, xml_file):
-        self.tree = ET.parse(xml_file)
-        self.root = self.tree.getroot()
-        self.width = int(self.root.get('width', 800))
-        self.height = int(self.root.get('height', 600))
-        physics_params = self.root.find('physics')
-        self.friction = float(physics_params.get('friction', 0.95))
+        spec = worlds.load(xml_file) # parsed once, cached by content hash
+        self.width, self.height, self.friction = spec.width, spec.height, spec.friction
+        count, margin = spec.spawn_food or (40, 20)
+        self.food_margin = margin # respawns keep to it too
         
         self.foods = []
-        for _ in range(40): 
+        self.food_index = spatial.SpatialHash(cell_size=50) # food list index -> grid cell
+        for _ in range(count): 
             self.foods.append([
-                random.randint(20, self.width - 20),
-                random.randint(20, self.height - 20)
+                random.randint(margin, self.width - margin),
+                random.randint(margin, self.height - margin)
             ])
+            self.food_index.insert(len(self.foods) - 1, *self.foods[-1])
 
     def respawn_food(self, index):
         self.foods[index] = [
-            random.randint(20, self.width - 20),
-            random.randint(20, self.height - 20)
+            random.randint(self.food_margin, self.width - self.food_margin),
+            random.randint(self.food_margin, self.height - self.food_margin)
         ]
+        self.food_index.move(index, *self.foods[index])
 
 class Agent:
     def __init__(self, x, y):
@@ -83,7 +91,9 @@ class Agent:
         for a in angles:
             radar_angle = math.radians(self.angle + a)
             reading = 250 
-            for food in world.foods:
+            # Only food in the grid cells under this radar's cone can be seen
+            for idx in world.food_index.cone_candidates(self.x, self.y, radar_angle, 0.2, 250):
+                food = world.foods[idx]
                 dist = math.hypot(food[0] - self.x, food[1] - self.y)
                 if dist < 250:
                     food_angle = math.atan2(food[1] - self.y, food[0] - self.x)
@@ -103,22 +113,74 @@ class Agent:
 
 generation = 0
 best_genome = None
+options = runtime.defaults() # command line switches (see axiocore/runtime.py)
+arena_pool = None # process pool for --arena independent
 
-def eval_genomes(genomes, config):
-    global generation, best_genome
-    generation += 1
-    
-    pygame.init()
+def ensure_world_file():
     # Check for World File
     if not os.path.exists('world_alpha.xml'):
         # Fallback if file missing
         with open('world_alpha.xml', 'w') as f:
-            f.write('<world width="800" height="600"><physics friction="0.95"/><entities><food x="100" y="100" energy="50"/></entities></world>')
+            f.write('<world width="800" height="600"><physics friction="0.95"/><spawn food="40" margin="20"/><entities><food x="100" y="100" energy="50"/></entities></world>')
 
+def eval_genomes(genomes, config):
+    global generation, best_genome
+    generation += 1
+    ensure_world_file()
+
+    if options.arena == 'independent':
+        results = arena_pool.evaluate(genomes, random.getrandbits(32), generation)
+        save_generation([genome for _, genome in genomes], sum(r.alive for r in results), config)
+    else:
+        world = World('world_alpha.xml')
+        render = runtime.renders(options, generation)
+        if options.engine == 'numpy':
+            ge, alive_agents = simulate_swarm(genomes, config, world, render)
+        else:
+            ge, alive_agents = simulate(genomes, config, world, render)
+        save_generation(ge, alive_agents, config)
+        if render and options.render != 'all': pygame.display.quit() # no frozen window until the next sample
+    if runtime.replays_champion(options, generation): replay_champion(genomes, config)
+
+def replay_champion(genomes, config):
+    """
+    --render champion: the generation's best replayed alone on screen, on a
+    copy, off the training RNG and off the books: no timings, early stops or
+    frame telemetry are recorded for it.
+    """
+    champion = copy.deepcopy(max((genome for _, genome in genomes), key=lambda g: g.fitness))
+    with runtime.preserved_rng(), runtime.swapped(globals(), timer=profiling.NullTimer(), early_stop=None,
+                                                  frame_log=None):
+        simulate([(champion.key, champion)], config, World('world_alpha.xml'), render=True)
+    pygame.display.quit()
+
+def evaluate_alone(genome, config, seed, gen):
+    """ Independent arena: one genome in its own world, rebuilt from the generation's seed. """
+    global generation
+    generation = gen
+    random.seed(seed)
     world = World('world_alpha.xml')
-    screen = pygame.display.set_mode((world.width, world.height))
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 18)
+    _, alive_agents = simulate([(genome.key, genome)], config, world, render=False)
+    return parallel.Result(genome.fitness, alive_agents > 0, False, None)
+
+def settle(agent, frame, hit_rate):
+    """ Early stop: fitness a stopped agent would still collect where it is, and the frames that saves. """
+    slow = agent.vel < 3
+    frames = min(1199 - frame, math.ceil(agent.energy / (3.5 if slow else 1.5)))
+    return (-0.1 * frames if slow else 0.0), frames
+
+def gain_bounds(agent, frame):
+    """ Early stop: (worst, best) fitness change still possible: crawl into the wall, or eat every frame. """
+    frames = 1199 - frame
+    return -0.1 * frames - 5, 10.0 * frames
+
+def simulate(genomes, config, world, render):
+    """ One episode of the whole population in a shared world. Returns (genomes, alive count). """
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((world.width, world.height))
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18)
 
     nets = []
     ge = []
@@ -132,26 +194,35 @@ def eval_genomes(genomes, config):
         spawn_x = (world.width // 2) + random.randint(-200, 200)
         spawn_y = (world.height // 2) + random.randint(-200, 200)
         agents.append(Agent(spawn_x, spawn_y))
+    if early_stop is not None: early_stop.start(agents, ge)
 
     for frame in range(1200): 
-        screen.fill((10, 10, 10))
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+        timer.begin_frame()
+        if render:
+            screen.fill((10, 10, 10))
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
 
+        timer.lap('render')
         alive_agents = 0
         for i, agent in enumerate(agents):
             if not agent.alive: continue
             alive_agents += 1
             agent.sense(world)
+            timer.lap('sense')
             inputs = [(250.0 - x) / 250.0 for x in agent.radars]
             output = nets[i].activate(inputs)
+            timer.lap('activate')
             agent.move(world.friction, output[0], output[1])
+            timer.lap('move')
             if agent.vel < 3: 
                 ge[i].fitness -= 0.1 
                 agent.energy -= 2    
-            for idx, food in enumerate(world.foods):
+            # Nearby cells only; sorted so the first food in the list still wins
+            for idx in sorted(world.food_index.radius_candidates(agent.x, agent.y, 20)):
+                food = world.foods[idx]
                 dist = math.hypot(agent.x - food[0], agent.y - food[1])
                 if dist < 20: 
                     ge[i].fitness += 10 
@@ -161,8 +232,15 @@ def eval_genomes(genomes, config):
             if agent.x < 5 or agent.x > world.width-5 or agent.y < 5 or agent.y > world.height-5:
                 ge[i].fitness -= 5 
                 agent.alive = False
+            timer.lap('reward')
 
+        if early_stop is not None: early_stop.review(frame)
+        timer.end_frame(alive_agents)
+        if frame_log is not None:
+            frame_log.record_many(metrics.agent_frame(generation, frame, [a.x for a in agents], [a.y for a in agents],
+                                                      [a.alive for a in agents], [g.fitness for g in ge]))
         if alive_agents == 0: break
+        if not render: continue
 
         for food in world.foods:
             pygame.draw.circle(screen, (255, 215, 0), (food[0], food[1]), 5)
@@ -173,8 +251,65 @@ def eval_genomes(genomes, config):
         text = font.render(f"Gen: {generation} | Alive: {alive_agents}", True, (255, 255, 255))
         screen.blit(text, (10, 10))
         pygame.display.flip()
+        timer.lap('render')
+        clock.tick(60)
+        timer.lap('tick')
+
+    return ge, alive_agents
+
+def simulate_swarm(genomes, config, world, render):
+    """ Same episode as simulate, with the whole population in one ForagingSwarm. """
+    ge = [genome for _, genome in genomes]
+    brains = batchnet.compile_population(ge, config, options.inference)
+    swarm = foraging.ForagingSwarm(world, len(ge), np.random.default_rng(random.getrandbits(32)))
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((world.width, world.height))
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18)
+
+    alive_agents = 0
+    for frame in range(1200):
+        timer.begin_frame()
+        if render:
+            screen.fill((10, 10, 10))
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+
+        timer.lap('render')
+        idx = np.flatnonzero(swarm.alive)
+        alive_agents = len(idx)
+        if alive_agents == 0: break
+        swarm.sense(idx)
+        timer.lap('sense')
+        outputs = brains.activate(swarm.inputs(idx), idx)
+        timer.lap('activate')
+        swarm.step(idx, outputs) # movement, food and walls in one pass: booked as 'move'
+        timer.lap('move')
+        timer.end_frame(alive_agents)
+        if frame_log is not None:
+            frame_log.record_many(metrics.agent_frame(generation, frame, swarm.x, swarm.y, swarm.alive, swarm.fitness))
+        if not render: continue
+
+        for fx, fy in swarm.food:
+            pygame.draw.circle(screen, (255, 215, 0), (int(fx), int(fy)), 5)
+        for i in np.flatnonzero(swarm.alive):
+            green_val = max(0, min(255, int((swarm.energy[i] / swarm.max_energy) * 255)))
+            pygame.draw.circle(screen, (255 - green_val, green_val, 0), (int(swarm.x[i]), int(swarm.y[i])), 12)
+        text = font.render(f"Gen: {generation} | Alive: {alive_agents}", True, (255, 255, 255))
+        screen.blit(text, (10, 10))
+        pygame.display.flip()
+        timer.lap('render')
         clock.tick(60)
+        timer.lap('tick')
+
+    for genome, fit in zip(ge, swarm.fitness):
+        genome.fitness = float(fit)
+    return ge, alive_agents
 
+def save_generation(ge, alive_agents, config):
     # --- SAVE STATS & MODEL EVERY GENERATION ---
     current_best = max(ge, key=lambda x: x.fitness)
     
@@ -185,38 +320,75 @@ def eval_genomes(genomes, config):
         avg_fit = sum(all_fitness) / len(all_fitness)
     else: max_fit, avg_fit = 0, 0
     
-    with open(log_filename, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([generation, max_fit, avg_fit, alive_agents])
+    generation_log.record({"Generation": generation, "Max Fitness": max_fit, "Avg Fitness": avg_fit,
+                           "Alive Count": alive_agents})
     
     # AUTO-SAVE MODEL
     print(f" > Gen {generation} Complete. Saving backup...")
     with open(autosave_filename, 'wb') as f:
         pickle.dump(current_best, f)
+    genomeio.save(brain_filename, current_best, config)
 
-def run(config_path):
+def run(config_path, cli=None):
+    global options, arena_pool, generation, frame_log, timer, early_stop
+    if cli is not None: options = cli
+    runtime.seed_everything(options.seed)
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                                 neat.DefaultSpeciesSet, neat.DefaultStagnation,
                                 config_path)
-    p = neat.Population(config)
+    if options.resume:
+        p = checkpoint.restore(checkpoint_filename if options.resume == 'auto' else options.resume, config)
+        generation = p.generation
+        print(f" >> Resumed from checkpoint at generation {generation}.")
+    else:
+        p = neat.Population(config)
     p.add_reporter(neat.StdOutReporter(True))
+    if options.checkpoint_every:
+        p.add_reporter(checkpoint.Checkpointer(p, checkpoint_filename, options.checkpoint_every))
     p.add_reporter(neat.StatisticsReporter())
+    generation_log.flush_seconds = options.log_flush
+    if options.log_frames and options.arena == 'shared':
+        frame_log = metrics.MetricsLog(f"axiogen_stage1_{timestamp}_frames.axm", flush_seconds=options.log_flush)
+    timing_log = None
+    if options.arena == 'independent':
+        arena_pool = parallel.ArenaPool(evaluate_alone, config, options.workers)
+    elif options.timings:
+        timer = profiling.PhaseTimer()
+        timing_log = metrics.MetricsLog(f"axiogen_stage1_{timestamp}_timings.axm", flush_seconds=0)
+        p.add_reporter(profiling.TimingReporter(timer, timing_log))
+    if options.engine == 'python':
+        early_stop = earlystop.from_options(options, config, settle, gain_bounds)
+    elif earlystop.requested(options):
+        print(" >> NOTICE: --stop-* is off with --engine numpy (the swarm has no early stop).")
+    if early_stop is not None: p.add_reporter(earlystop.EarlyStopReporter(early_stop))
+    stream = live.from_options(options, p, {'generation': generation_log, 'timings': timing_log}) # --live
+    fitness_function = eval_genomes
+    if options.profile_gen:
+        fitness_function = profiling.profile_generation(eval_genomes, options.profile_gen, p.generation + 1,
+                                                        "axiogen_stage1")
 
     try:
         # Run safely
-        winner = p.run(eval_genomes, 100)
+        winner = p.run(fitness_function, 100 - p.generation)
         
         # Final Save
         final_name = f"axiogen_stage1_FINAL_{timestamp}.pkl"
         with open(final_name, 'wb') as f:
             pickle.dump(winner, f)
+        genomeio.save(f"axiogen_stage1_FINAL_{timestamp}.axg", winner, config)
         print(f"VICTORY. Saved to {final_name}")
         
     except Exception as e:
         print(f"\nSimulation Stopped: {e}")
         print(f"Don't worry! The latest model is saved in: {autosave_filename}")
+    finally:
+        if arena_pool is not None: arena_pool.close()
+        generation_log.close()
+        if frame_log is not None: frame_log.close()
+        if stream is not None: stream.close()
 
 if __name__ == "__main__":
+    args = runtime.build_parser("AXIOGEN Stage 1: The Wolf").parse_args()
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, 'config-feedforward.txt')
-    run(config_path)
\ No newline at end of file
+    run(config_path, args)
\ No newline at end of file
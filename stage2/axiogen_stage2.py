@@ -5,44 +5,72 @@ import neat
 import os
 import random
 import pickle
-import csv
 import datetime
 import copy
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from axiocore import runtime, batchnet, parallel, raycast, checkpoint, genomeio, transfer, metrics, profiling, earlystop, worlds, coverage, novelty, physics, broadphase, mazegen, live
+import numpy as np
+
 # --- PROJECT AXIOGEN: STAGE 2 (V4.2 - STABLE) ---
 
 # Initialize global generation counter
 generation = 0 
+options = runtime.defaults() # command line switches (see axiocore/runtime.py)
+arena_pool = None # process pool for --arena independent
 
 timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 log_filename = f"axiogen_stage2_{timestamp}.csv"
 autosave_filename = f"axiogen_stage2_AUTOSAVE.pkl"
+brain_filename = f"axiogen_stage2_AUTOSAVE.axg" # same brain, compact format (axiocore/genomeio.py)
+checkpoint_filename = f"axiogen_stage2_CHECKPOINT.pkl.gz" # full population, see --resume
+
+# Buffered logs (axiocore/metrics.py): nothing is written before the first flush
+generation_log = metrics.MetricsLog(f"axiogen_stage2_{timestamp}.axm", csv_path=log_filename)
+frame_log = None # per-frame, per-agent telemetry (--log-frames)
+coverage_log = metrics.MetricsLog(f"axiogen_stage2_{timestamp}_coverage.axm") # explored cells per generation
+timer = profiling.NullTimer() # --timings swaps in a PhaseTimer
+early_stop = None # earlystop.EarlyStop with --stop-*
+archive = None # novelty.BehaviourArchive with --novelty
+
+WORLD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'world_maze.xml')
 
-# Setup CSV
-with open(log_filename, mode='w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Generation", "Max Exploration", "Avg Exploration", "Alive Count"])
+REACH = 150 # radar range: the farthest wall an agent can touch (axiocore/broadphase.py)
 
 class World:
-    def __init__(self):
-        self.width, self.height = 800, 600
-        self.friction = 0.92
-        self.walls = []
-        # Borders
-        self.create_wall(0, 0, 800, 15)
-        self.create_wall(0, 585, 800, 15)
-        self.create_wall(0, 0, 15, 600)
-        self.create_wall(785, 0, 15, 600)
+    def __init__(self, path=None):
+        spec = worlds.load(path or options.world or WORLD_FILE) # parsed once, cached by content hash
+        self.width, self.height = spec.width, spec.height
+        self.friction = spec.friction
+        self.walls = spec.wall_rects() # Borders
+        self.start = spec.start or (400, 300)
         # Random Maze
-        for _ in range(12):
-            w, h = random.randint(60, 200), random.randint(60, 200)
-            x, y = random.randint(100, 600), random.randint(100, 400)
-            if random.random() > 0.5: self.create_wall(x, y, w, 20)
-            else: self.create_wall(x, y, 20, h)
+        maze = spec.maze
+        if maze is not None:
+            for _ in range(maze['walls']):
+                w, h = random.randint(*maze['length']), random.randint(*maze['length'])
+                x, y = random.randint(*maze['x']), random.randint(*maze['y'])
+                if random.random() > 0.5: self.create_wall(x, y, w, maze['thickness'])
+                else: self.create_wall(x, y, maze['thickness'], h)
+        # Procedural labyrinth filling the border, explored from its middle room
+        lab = spec.labyrinth
+        if lab is not None:
+            cell = lab['cell']
+            cols, rows = (self.width - 2 * spec.border) // cell, (self.height - 2 * spec.border) // cell
+            x0, y0 = (self.width - cols * cell) // 2, (self.height - rows * cell) // 2
+            for rect in mazegen.labyrinth(x0, y0, cols, rows, cell, lab['thickness'], random, lab['loops']):
+                self.create_wall(*rect)
+            if spec.start is None: self.start = (x0 + cols // 2 * cell + cell // 2, y0 + rows // 2 * cell + cell // 2)
+        self.index_walls()
 
     def create_wall(self, x, y, w, h):
         self.walls.append(pygame.Rect(x, y, w, h))
 
+    def index_walls(self):
+        """ (Re)builds the ray-cast arrays and the broadphase grid after the walls changed. """
+        self.wall_set = raycast.WallSet(self.walls) # for --engine numpy
+        self.grid = broadphase.WallGrid(self.walls, REACH, self.width, self.height)
+
 class Agent:
     def __init__(self, x, y):
         self.x, self.y = x, y
@@ -50,8 +78,8 @@ class Agent:
         self.angle = random.randint(0, 360) 
         self.vel = 0
         self.alive = True
-        self.visited_sectors = set() 
         self.stagnation_timer = 0 
+        self.wall_hits = 0
 
     def move(self, world, speed_output, turn_output):
         if not self.alive: return False
@@ -64,20 +92,22 @@ class Agent:
         new_y = self.y + math.sin(rad) * self.vel
         
         agent_rect = pygame.Rect(new_x - 10, new_y - 10, 20, 20)
-        collision_idx = agent_rect.collidelist(world.walls)
+        walls = world.grid.rects_near(new_x, new_y) # the walls near the agent, in wall order
+        collision_idx = agent_rect.collidelist(walls)
         
         if collision_idx == -1:
             self.x, self.y = new_x, new_y
             self.vel *= world.friction
             hit = False
         else:
-            wall = world.walls[collision_idx]
+            wall = walls[collision_idx]
             if self.x < wall.centerx: self.x -= 3
             else: self.x += 3
             if self.y < wall.centery: self.y -= 3
             else: self.y += 3
             self.vel = 0 
             hit = True
+            self.wall_hits += 1
         
         self.stagnation_timer += 1
         if self.stagnation_timer > 180: self.alive = False
@@ -91,7 +121,7 @@ class Agent:
             start_pos = (self.x, self.y)
             end_pos = (self.x + math.cos(radar_angle)*150, self.y + math.sin(radar_angle)*150)
             closest_dist = 150
-            for wall in world.walls:
+            for wall in world.grid.rects_near(self.x, self.y):
                 clipped_line = wall.clipline(start_pos, end_pos)
                 if clipped_line:
                     dist = math.hypot(clipped_line[0][0] - self.x, clipped_line[0][1] - self.y)
@@ -103,101 +133,234 @@ class Agent:
         color_val = max(0, 255 - (self.stagnation_timer * 1.4))
         pygame.draw.circle(screen, (255 - color_val, color_val, 255), (int(self.x), int(self.y)), self.radius)
 
+SECTOR = 20 # exploration grid, in pixels
+
+RADAR_ANGLES = np.array([-45, -20, 0, 20, 45])
+
+def sense_all(world, agents):
+    """ Agent.sense for many agents at once: every radar against every wall in one ray cast. """
+    x = [a.x for a in agents]
+    y = [a.y for a in agents]
+    angles = np.radians(np.array([a.angle for a in agents], dtype=float)[:, None] + RADAR_ANGLES)
+    for agent, radars in zip(agents, world.wall_set.cast(x, y, angles, 150, near=world.grid.near(x, y)).tolist()):
+        agent.radars = radars
+
+def move_all(world, agents, outputs):
+    """ Agent.move for many agents at once (axiocore/physics.py). Returns the per-agent wall hits. """
+    speed, turn = np.asarray(outputs, dtype=float).reshape(-1, 2).T
+    x, y, angle, vel, hit = physics.step([a.x for a in agents], [a.y for a in agents], [a.angle for a in agents],
+                                         [a.vel for a in agents], speed, turn, world.wall_set, world.friction, 6,
+                                         grid=world.grid)
+    hits = (hit >= 0).tolist()
+    for agent, ax, ay, aa, av, h in zip(agents, x.tolist(), y.tolist(), angle.tolist(), vel.tolist(), hits):
+        agent.x, agent.y, agent.angle, agent.vel = ax, ay, aa, av
+        agent.wall_hits += h
+        agent.stagnation_timer += 1
+        if agent.stagnation_timer > 180: agent.alive = False
+    return hits
+
 def eval_genomes(genomes, config):
     global generation
     generation += 1
-    pygame.init()
-    world = World() 
-    screen = pygame.display.set_mode((world.width, world.height))
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 18)
-    memory_surface = pygame.Surface((world.width, world.height))
-    memory_surface.set_alpha(70); memory_surface.fill((0, 0, 0))
-
-    nets, ge, agents = [], [], []
+    if options.arena == 'independent':
+        results = arena_pool.evaluate(genomes, random.getrandbits(32), generation)
+        save_generation([genome for _, genome in genomes], sum(r.alive for r in results), config)
+    else:
+        world = World() 
+        render = runtime.renders(options, generation)
+        ge, alive_count, grid, finals = simulate(genomes, config, world, render)
+        if archive is not None:
+            # Curiosity across generations: ending somewhere past explorers rarely reached pays
+            for genome, score in zip(ge, archive.score(finals)): genome.fitness += options.novelty * score
+        save_generation(ge, alive_count, config)
+        coverage_log.record({'generation': generation, **grid.stats()})
+        if render and options.render != 'all': pygame.display.quit() # no frozen window until the next sample
+    if runtime.replays_champion(options, generation): replay_champion(genomes, config)
+
+def replay_champion(genomes, config):
+    """
+    --render champion: the generation's best replayed alone on screen, on a
+    copy, off the training RNG and off the books: no timings, early stops or
+    frame telemetry are recorded for it.
+    """
+    champion = copy.deepcopy(max((genome for _, genome in genomes), key=lambda g: g.fitness))
+    with runtime.preserved_rng(), runtime.swapped(globals(), timer=profiling.NullTimer(), early_stop=None,
+                                                  frame_log=None):
+        simulate([(champion.key, champion)], config, World(), render=True)
+    pygame.display.quit()
+
+def evaluate_alone(genome, config, seed, gen):
+    """ Independent arena: one genome in its own maze, rebuilt from the generation's seed. """
+    global generation
+    generation = gen
+    random.seed(seed)
+    world = World()
+    _, alive_count, _, _ = simulate([(genome.key, genome)], config, world, render=False)
+    return parallel.Result(genome.fitness, alive_count > 0, False, None)
+
+def settle(agent, frame, hit_rate):
+    """ Early stop: a stuck explorer finds no new sector, so it pays 0.04 a frame (and its bounces) until it stagnates. """
+    frames = max(0, min(1199 - frame, 181 - agent.stagnation_timer))
+    return frames * (-0.04 - hit_rate), frames
+
+def gain_bounds(agent, frame):
+    """ Early stop: (worst, best) fitness change still possible: a bounce every frame, or a new sector every frame. """
+    frames = 1199 - frame
+    return -1.04 * frames, 15.0 * frames
+
+def simulate(genomes, config, world, render):
+    """ One episode of the whole population in a shared maze. Returns (genomes, alive count, coverage grid, final positions). """
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((world.width, world.height))
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18)
+        memory_surface = pygame.Surface((world.width, world.height))
+        memory_surface.set_alpha(70); memory_surface.fill((0, 0, 0))
+
+    ge, agents = [], []
     for _, genome in genomes:
         genome.fitness = 0.0 # Force float initialization
-        nets.append(neat.nn.FeedForwardNetwork.create(genome, config))
         ge.append(genome)
-        agents.append(Agent(400, 300))
+        agents.append(Agent(*world.start))
+    grid = coverage.CoverageGrid(len(agents), world.width, world.height, SECTOR)
+    brains = batchnet.compile_population(ge, config, options.inference)
+    if early_stop is not None: early_stop.start(agents, ge)
 
     for frame in range(1200): 
-        screen.fill((15, 15, 15))
-        for wall in world.walls: pygame.draw.rect(screen, (60, 60, 60), wall)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
-
-        alive_count = 0
-        for i, agent in enumerate(agents):
-            if not agent.alive: continue
-            alive_count += 1
-            agent.sense(world)
-            inputs = [(150.0 - x) / 150.0 for x in agent.radars]
-            output = nets[i].activate(inputs)
-            hit_wall = agent.move(world, output[0], output[1])
+        timer.begin_frame()
+        if render:
+            screen.fill((15, 15, 15))
+            for wall in world.walls: pygame.draw.rect(screen, (60, 60, 60), wall)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+
+        timer.lap('render')
+        # Agents never interact, so everyone senses first and thinks in one batch
+        live = [i for i, agent in enumerate(agents) if agent.alive]
+        alive_count = len(live)
+        if options.engine == 'numpy': sense_all(world, [agents[i] for i in live])
+        else:
+            for i in live: agents[i].sense(world)
+        timer.lap('sense')
+        inputs = [[(150.0 - x) / 150.0 for x in agents[i].radars] for i in live]
+        outputs = brains.activate(inputs, live).tolist()
+        timer.lap('activate')
+        if options.engine == 'numpy': hits = move_all(world, [agents[i] for i in live], outputs)
+        else: hits = [agents[i].move(world, output[0], output[1]) for i, output in zip(live, outputs)]
+        timer.lap('move')
+        # Every explorer's sector is looked up (and marked) in the coverage grid at once
+        new = grid.visit(live, [agents[i].x for i in live], [agents[i].y for i in live]).tolist()
+        for i, hit_wall, found in zip(live, hits, new):
             if hit_wall: ge[i].fitness -= 1.0
-            
-            grid_size = 20
-            sx, sy = int(agent.x // grid_size), int(agent.y // grid_size)
-            if (sx, sy) not in agent.visited_sectors:
-                agent.visited_sectors.add((sx, sy))
+            if found:
                 ge[i].fitness += 15.0 
-                agent.stagnation_timer = 0
-                pygame.draw.rect(memory_surface, (0, 100, 255), (sx*grid_size, sy*grid_size, grid_size, grid_size))
+                agents[i].stagnation_timer = 0
+                if render:
+                    sx, sy = int(agents[i].x // SECTOR), int(agents[i].y // SECTOR)
+                    pygame.draw.rect(memory_surface, (0, 100, 255), (sx*SECTOR, sy*SECTOR, SECTOR, SECTOR))
             else:
                 ge[i].fitness -= 0.04
+        timer.lap('reward')
 
+        if early_stop is not None: early_stop.review(frame)
+        timer.end_frame(alive_count)
+        if frame_log is not None:
+            frame_log.record_many(metrics.agent_frame(generation, frame, [a.x for a in agents], [a.y for a in agents],
+                                                      [a.alive for a in agents], [g.fitness for g in ge]))
         if alive_count == 0: break
+        if not render: continue
         screen.blit(memory_surface, (0,0))
         for agent in agents: agent.draw(screen)
         text = font.render(f"Gen: {generation} | Explorers: {alive_count}", True, (255, 255, 255))
         screen.blit(text, (10, 10))
         pygame.display.flip()
+        timer.lap('render')
         clock.tick(60)
+        timer.lap('tick')
+
+    return ge, alive_count, grid, [(a.x, a.y) for a in agents]
 
+def save_generation(ge, alive_count, config):
     # Logging & AutoSave
     if len(ge) > 0:
         best_g = max(ge, key=lambda x: x.fitness)
-        with open(log_filename, mode='a', newline='') as f:
-            csv.writer(f).writerow([generation, best_g.fitness, sum(g.fitness for g in ge)/len(ge), alive_count])
+        generation_log.record({"Generation": generation, "Max Exploration": best_g.fitness,
+                               "Avg Exploration": sum(g.fitness for g in ge)/len(ge), "Alive Count": alive_count})
         with open(autosave_filename, 'wb') as f:
             pickle.dump(best_g, f)
+        genomeio.save(brain_filename, best_g, config)
 
-def run(config_path):
+def checkpoint_state():
+    """ Stage 2 state that --resume needs besides the population: the novelty archive. """
+    return {} if archive is None else {'novelty': archive.state()}
+
+def run(config_path, cli=None):
+    global options, arena_pool, generation, frame_log, timer, early_stop, archive
+    if cli is not None: options = cli
+    runtime.seed_everything(options.seed)
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                                 neat.DefaultSpeciesSet, neat.DefaultStagnation,
                                 config_path)
     
     # Proper Transfer Learning Injection
-    p = neat.Population(config)
-    
-    try:
-        # LOOK FOR THE BRAIN
-        with open('axiogen_stage1_BEST.pkl', 'rb') as f:
-            stage1_genome = pickle.load(f)
-        
-        # We must replace the population and RESET species to avoid the TypeError
-        new_pop = {}
-        for i in range(config.pop_size):
-            key = i + 1
-            g = copy.deepcopy(stage1_genome)
-            g.key = key
-            g.fitness = 0.0
-            g.mutate(config.genome_config) # Add variation
-            new_pop[key] = g
-            
-        p.population = new_pop
-        # FORCE re-speciation
-        p.species.speciate(config, p.population, p.generation)
-        print(" >> SUCCESS: Wolf Brain Injected and Speciated.")
-        
-    except Exception as e:
-        print(f" >> NOTICE: Starting from scratch. (Reason: {e})")
+    saved = {} # stage state from the checkpoint (the novelty archive)
+    if options.resume:
+        p = checkpoint.restore(checkpoint_filename if options.resume == 'auto' else options.resume, config,
+                               saved.update)
+        generation = p.generation
+        print(f" >> Resumed from checkpoint at generation {generation}.")
+    else:
+        try:
+            # LOOK FOR THE BRAIN: the whole population starts as mutated copies of it
+            stage1_genome = genomeio.load_brain('axiogen_stage1_BEST', config) # .axg, else .pkl
+            p = transfer.seeded_population(config, stage1_genome)
+            print(" >> SUCCESS: Wolf Brain Injected and Speciated.")
+        except Exception as e:
+            print(f" >> NOTICE: Starting from scratch. (Reason: {e})")
+            p = neat.Population(config)
 
     p.add_reporter(neat.StdOutReporter(True))
-    p.run(eval_genomes, 100)
+    if options.checkpoint_every:
+        p.add_reporter(checkpoint.Checkpointer(p, checkpoint_filename, options.checkpoint_every, checkpoint_state))
+    generation_log.flush_seconds = coverage_log.flush_seconds = options.log_flush
+    if options.log_frames and options.arena == 'shared':
+        frame_log = metrics.MetricsLog(f"axiogen_stage2_{timestamp}_frames.axm", flush_seconds=options.log_flush)
+    timing_log = None
+    if options.arena == 'independent':
+        arena_pool = parallel.ArenaPool(evaluate_alone, config, options.workers)
+    elif options.timings:
+        timer = profiling.PhaseTimer()
+        timing_log = metrics.MetricsLog(f"axiogen_stage2_{timestamp}_timings.axm", flush_seconds=0)
+        p.add_reporter(profiling.TimingReporter(timer, timing_log))
+    archive = novelty.from_options(options)
+    if options.novelty and archive is None:
+        print(" >> NOTICE: --novelty is off with --arena independent (the archive needs the whole population).")
+    if archive is not None:
+        if 'novelty' in saved: archive.load(saved['novelty'])
+        p.add_reporter(novelty.NoveltyReporter(archive))
+    if archive is not None and options.stop_cutoff:
+        print(" >> NOTICE: --stop-cutoff is off with --novelty (its best case does not include the novelty bonus).")
+        options.stop_cutoff = False
+    early_stop = earlystop.from_options(options, config, settle, gain_bounds)
+    if early_stop is not None: p.add_reporter(earlystop.EarlyStopReporter(early_stop))
+    stream = live.from_options(options, p, {'generation': generation_log, 'timings': timing_log,
+                                            'coverage': coverage_log}) # --live
+    fitness_function = eval_genomes
+    if options.profile_gen:
+        fitness_function = profiling.profile_generation(eval_genomes, options.profile_gen, p.generation + 1,
+                                                        "axiogen_stage2")
+    try:
+        p.run(fitness_function, 100 - p.generation)
+    finally:
+        if arena_pool is not None: arena_pool.close()
+        generation_log.close()
+        coverage_log.close()
+        if frame_log is not None: frame_log.close()
+        if stream is not None: stream.close()
 
 if __name__ == "__main__":
+    args = runtime.build_parser("AXIOGEN Stage 2: The Scientist").parse_args()
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, 'config-feedforward.txt')
-    run(config_path)
\ No newline at end of file
+    run(config_path, args)
\ No newline at end of file
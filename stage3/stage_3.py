@@ -5,39 +5,44 @@ import neat
 import os
 import random
 import pickle
-import csv
 import datetime
 import copy
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from axiocore import runtime, batchnet, parallel, sensortable, checkpoint, genomeio, transfer, metrics, profiling, memo, earlystop, worlds, physics, live
+import numpy as np
+
 # --- PROJECT AXIOGEN: STAGE 3 (STRICT LOGIC GATE) ---
 
 generation = 0
+options = runtime.defaults() # command line switches (see axiocore/runtime.py)
+arena_pool = None # process pool for --arena independent
 timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 log_filename = f"axiogen_stage3_{timestamp}.csv"
 autosave_filename = f"axiogen_stage3_AUTOSAVE.pkl"
+brain_filename = f"axiogen_stage3_AUTOSAVE.axg" # same brain, compact format (axiocore/genomeio.py)
+checkpoint_filename = f"axiogen_stage3_CHECKPOINT.pkl.gz" # full population, see --resume
+
+# Buffered logs (axiocore/metrics.py): nothing is written before the first flush
+generation_log = metrics.MetricsLog(f"axiogen_stage3_{timestamp}.axm", csv_path=log_filename)
+frame_log = None # per-frame, per-agent telemetry (--log-frames)
+timer = profiling.NullTimer() # --timings swaps in a PhaseTimer
+early_stop = None # earlystop.EarlyStop with --stop-*
+fitness_cache = None # memo.FitnessCache with --memo
 
-# Force-initialize CSV
-with open(log_filename, mode='w', newline='') as file:
-    writer = csv.writer(file)
-    writer.writerow(["Generation", "Max Fitness", "Avg Fitness", "Success Count"])
+WORLD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'world_keygate.xml')
 
 class World:
-    def __init__(self):
-        self.width, self.height = 800, 600
-        self.friction = 0.92
-        # THE GREAT WALL: Completely splits the screen at x=400
-        self.walls = [
-            pygame.Rect(0, 0, 800, 15), pygame.Rect(0, 585, 800, 15), # Top/Bottom
-            pygame.Rect(0, 0, 15, 600), pygame.Rect(785, 0, 15, 600), # Left/Right
-            pygame.Rect(390, 0, 20, 250), # Top half of divider
-            pygame.Rect(390, 350, 20, 250) # Bottom half of divider
-        ]
-        # THE GATE: Fills the gap in the divider
-        self.gate_rect = pygame.Rect(390, 250, 20, 100)
-        
-        # KEY & GOAL
-        self.switch_pos = (100, 100) # Top Left
-        self.goal_pos = (700, 300)   # Center Right
+    def __init__(self, path=WORLD_FILE):
+        spec = worlds.load(path) # world_keygate.xml, parsed once and cached by content hash
+        self.width, self.height = spec.width, spec.height
+        self.friction = spec.friction
+        self.walls = spec.wall_rects() # borders and the wall splitting the screen at x=400
+        self.gate_rect = spec.gate_rect() # fills the gap in the divider
+        self.gated_walls = self.walls + [self.gate_rect] # what an agent without the key runs into
+        self.wall_set = spec.wall_set(with_gate=True) # for --engine numpy, built once per file
+        self.switch_pos = spec.switch # the key
+        self.goal_pos = spec.goal
         
 class Agent:
     def __init__(self, x, y):
@@ -48,6 +53,7 @@ class Agent:
         self.alive = True
         self.has_key = False 
         self.energy = 1500 
+        self.wall_hits = 0
         self.radars = [] 
 
     def move(self, world, speed_output, turn_output):
@@ -71,6 +77,7 @@ class Agent:
             self.x, self.y = new_x, new_y
         else:
             self.vel = -2 # Bounce
+            self.wall_hits += 1
             
         self.vel *= world.friction
         self.energy -= 1
@@ -86,64 +93,171 @@ class Agent:
             end_pos = (self.x + math.cos(radar_angle)*150, self.y + math.sin(radar_angle)*150)
             closest_dist = 150
             # Sense walls. Only sense gate if key is missing.
-            targets = world.walls + ([world.gate_rect] if not self.has_key else [])
+            targets = world.walls if self.has_key else world.gated_walls
             for wall in targets:
                 clipped = wall.clipline(start_pos, end_pos)
                 if clipped:
                     d = math.hypot(clipped[0][0]-self.x, clipped[0][1]-self.y)
                     if d < closest_dist: closest_dist = d
             self.radars.append(closest_dist)
-            
+        self.sense_targets(world)
+
+    def sense_targets(self, world):
         # Distances to objects
         self.dist_s = math.hypot(world.switch_pos[0]-self.x, world.switch_pos[1]-self.y)
         self.ang_s = math.atan2(world.switch_pos[1]-self.y, world.switch_pos[0]-self.x) - math.radians(self.angle)
         self.dist_g = math.hypot(world.goal_pos[0]-self.x, world.goal_pos[1]-self.y)
         self.ang_g = math.atan2(world.goal_pos[1]-self.y, world.goal_pos[0]-self.x) - math.radians(self.angle)
 
+RADAR_ANGLES = np.array([-45, -20, 0, 20, 45])
+
+def sensor_table(world):
+    """ The precomputed radar table for this world (--sensor-table), built on first use. """
+    return sensortable.load(world.walls, world.gate_rect, world.width, world.height, 150, RADAR_ANGLES,
+                            cell=options.table_cell, step=options.table_step)
+
+def sense_all(world, agents):
+    """ Agent.sense for many agents at once: one ray cast (or table lookup) for every radar. """
+    x = [a.x for a in agents]
+    y = [a.y for a in agents]
+    if options.sensor_table:
+        readings = sensor_table(world).lookup(x, y, [a.angle for a in agents], [a.has_key for a in agents])
+    else:
+        angles = np.radians(np.array([a.angle for a in agents], dtype=float)[:, None] + RADAR_ANGLES)
+        # The gate (last wall) is only there for agents without the key
+        visible = np.ones((len(agents), len(world.gated_walls)), dtype=bool)
+        visible[:, -1] = [not a.has_key for a in agents]
+        readings = world.wall_set.cast(x, y, angles, 150, visible)
+    for agent, radars in zip(agents, readings.tolist()):
+        agent.radars = radars
+        agent.sense_targets(world)
+
+def move_all(world, agents, outputs):
+    """ Agent.move for many agents at once (axiocore/physics.py). Returns the per-agent wall hits. """
+    speed, turn = np.asarray(outputs, dtype=float).reshape(-1, 2).T
+    # The gate (last wall) is only solid for agents without the key
+    solid = np.ones((len(agents), len(world.gated_walls)), dtype=bool)
+    solid[:, -1] = [not a.has_key for a in agents]
+    x, y, angle, vel, hit = physics.step([a.x for a in agents], [a.y for a in agents], [a.angle for a in agents],
+                                         [a.vel for a in agents], speed, turn, world.wall_set, world.friction, 8,
+                                         rebound=-2, solid=solid)
+    hits = (hit >= 0).tolist()
+    for agent, ax, ay, aa, av, h in zip(agents, x.tolist(), y.tolist(), angle.tolist(), vel.tolist(), hits):
+        agent.x, agent.y, agent.angle, agent.vel = ax, ay, aa, av
+        agent.wall_hits += h
+        agent.energy -= 1
+        if agent.energy <= 0: agent.alive = False
+    return hits
+
 def eval_genomes(genomes, config):
     global generation
     generation += 1
-    pygame.init()
-    world = World() 
-    screen = pygame.display.set_mode((world.width, world.height))
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 18)
+    # The world is fixed and nothing is random, so every episode is episode 0
+    todo, keys, recalled = genomes, None, 0
+    if fitness_cache is not None: todo, keys, recalled = fitness_cache.recall(genomes, 0)
+    if options.arena == 'independent':
+        results = arena_pool.evaluate(todo, random.getrandbits(32), generation)
+        successes = [r.success for r in results]
+    else:
+        world = World() 
+        render = runtime.renders(options, generation)
+        _, successes = simulate(todo, config, world, render)
+        if render and options.render != 'all': pygame.display.quit() # no frozen window until the next sample
+    if fitness_cache is not None: fitness_cache.store(keys, todo, successes)
+    save_generation([genome for _, genome in genomes], recalled + sum(successes), config)
+    if runtime.replays_champion(options, generation): replay_champion(genomes, config)
+
+def replay_champion(genomes, config):
+    """
+    --render champion: the generation's best replayed alone on screen, on a
+    copy, off the training RNG and off the books: no timings, early stops or
+    frame telemetry are recorded for it.
+    """
+    champion = copy.deepcopy(max((genome for _, genome in genomes), key=lambda g: g.fitness))
+    with runtime.preserved_rng(), runtime.swapped(globals(), timer=profiling.NullTimer(), early_stop=None,
+                                                  frame_log=None):
+        simulate([(champion.key, champion)], config, World(), render=True)
+    pygame.display.quit()
+
+def evaluate_alone(genome, config, seed, gen):
+    """ Independent arena: one genome in its own copy of the key/gate world. """
+    global generation
+    generation = gen
+    random.seed(seed)
+    _, successes = simulate([(genome.key, genome)], config, World(), render=False)
+    return parallel.Result(genome.fitness, False, successes[0], None)
 
-    nets, ge, agents = [], [], []
+def settle(agent, frame, hit_rate):
+    """ Early stop: the shaping reward at the agent's spot (minus its bounces) for the energy it has left. """
+    rate = (800 - agent.dist_g) / 100 if agent.has_key else (800 - agent.dist_s) / 400
+    return agent.energy * (rate - 0.1 * hit_rate), agent.energy
+
+def gain_bounds(agent, frame):
+    """ Early stop: (worst, best) fitness change still possible with the energy left, at 8 px a frame at most. """
+    frames, reach = agent.energy, 8 * agent.energy
+    if agent.has_key:
+        return -2.1 * frames, 8.0 * frames + (15000 if agent.dist_g - 40 <= reach else 0)
+    return -2.1 * frames, 2.0 * frames + (20000 + 8.0 * frames if agent.dist_s - 40 <= reach else 0)
+
+def simulate(genomes, config, world, render):
+    """ One episode of the whole population. Returns (genomes, per-genome goal flags). """
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((world.width, world.height))
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18)
+
+    ge, agents = [], []
     for _, genome in genomes:
         genome.fitness = 0.0
-        nets.append(neat.nn.FeedForwardNetwork.create(genome, config))
         ge.append(genome)
         # SPAWN ON LEFT SIDE (Same as key)
         agents.append(Agent(100, 500)) 
+    brains = batchnet.compile_population(ge, config, options.inference)
+    if early_stop is not None: early_stop.start(agents, ge)
 
+    # Sense the whole population in one call (batched ray cast or sensor table)
+    batched = options.engine == 'numpy' or options.sensor_table
     success_count = 0
+    successes = [False] * len(ge)
     running = True
+    frame = 0
     while running and len(agents) > 0:
-        screen.fill((15, 15, 15))
-        for wall in world.walls: pygame.draw.rect(screen, (60, 60, 60), wall)
-        pygame.draw.rect(screen, (180, 0, 0), world.gate_rect) # Gate
-        pygame.draw.circle(screen, (0, 100, 255), world.switch_pos, 20) # Key
-        pygame.draw.circle(screen, (0, 255, 100), world.goal_pos, 25)   # Goal
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
-
-        active_agents = 0
-        for i, agent in enumerate(agents):
-            if not agent.alive: continue
-            active_agents += 1
-            agent.sense(world)
-            
-            inputs = [
+        timer.begin_frame()
+        if render:
+            screen.fill((15, 15, 15))
+            for wall in world.walls: pygame.draw.rect(screen, (60, 60, 60), wall)
+            pygame.draw.rect(screen, (180, 0, 0), world.gate_rect) # Gate
+            pygame.draw.circle(screen, (0, 100, 255), world.switch_pos, 20) # Key
+            pygame.draw.circle(screen, (0, 255, 100), world.goal_pos, 25)   # Goal
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+
+        timer.lap('render')
+        # Agents never interact, so everyone senses first and thinks in one batch
+        live = [i for i, agent in enumerate(agents) if agent.alive]
+        active_agents = len(live)
+        if batched: sense_all(world, [agents[i] for i in live])
+        inputs = []
+        for i in live:
+            agent = agents[i]
+            if not batched: agent.sense(world)
+            inputs.append([
                 *[(150-x)/150 for x in agent.radars],
                 agent.dist_s / 800, math.sin(agent.ang_s),
                 agent.dist_g / 800, math.sin(agent.ang_g),
                 1.0 if agent.has_key else 0.0
-            ]
-            
-            output = nets[i].activate(inputs)
-            hit = agent.move(world, output[0], output[1])
+            ])
+        timer.lap('sense')
+        outputs = brains.activate(inputs, live).tolist()
+        timer.lap('activate')
+
+        if options.engine == 'numpy': hits = move_all(world, [agents[i] for i in live], outputs)
+        else: hits = [agents[i].move(world, output[0], output[1]) for i, output in zip(live, outputs)]
+        timer.lap('move')
+        for i, hit in zip(live, hits):
+            agent = agents[i]
             if hit: ge[i].fitness -= 0.1
 
             # REWARD LOGIC
@@ -160,10 +274,19 @@ def eval_genomes(genomes, config):
                 if agent.dist_g < 40:
                     ge[i].fitness += 15000
                     success_count += 1
+                    successes[i] = True
                     agent.alive = False
                     print(f"Gen {generation}: [GOAL REACHED]")
+        timer.lap('reward')
 
+        if early_stop is not None: early_stop.review(frame)
+        timer.end_frame(active_agents)
+        if frame_log is not None:
+            frame_log.record_many(metrics.agent_frame(generation, frame, [a.x for a in agents], [a.y for a in agents],
+                                                      [a.alive for a in agents], [g.fitness for g in ge]))
+        frame += 1
         if active_agents == 0: running = False
+        if not render: continue
         for agent in agents:
             c = (255, 255, 0) if agent.has_key else (0, 200, 255)
             pygame.draw.circle(screen, c, (int(agent.x), int(agent.y)), 10)
@@ -171,47 +294,82 @@ def eval_genomes(genomes, config):
         text = font.render(f"Gen: {generation} | Success: {success_count} | Alive: {active_agents}", True, (255, 255, 255))
         screen.blit(text, (10, 10))
         pygame.display.flip()
+        timer.lap('render')
         clock.tick(60)
+        timer.lap('tick')
+
+    return ge, successes
 
+def save_generation(ge, success_count, config):
     # SECURE LOGGING
     if len(ge) > 0:
         max_f = max(g.fitness for g in ge)
         avg_f = sum(g.fitness for g in ge) / len(ge)
-        with open(log_filename, mode='a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([generation, max_f, avg_f, success_count])
-            f.flush()
+        generation_log.record({"Generation": generation, "Max Fitness": max_f, "Avg Fitness": avg_f,
+                               "Success Count": success_count})
         
         best_agent = max(ge, key=lambda x: x.fitness)
         with open(autosave_filename, 'wb') as f:
             pickle.dump(best_agent, f)
+        genomeio.save(brain_filename, best_agent, config)
 
-def run(config_path):
+def run(config_path, cli=None):
+    global options, arena_pool, generation, frame_log, timer, fitness_cache, early_stop
+    if cli is not None: options = cli
+    runtime.seed_everything(options.seed)
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                                 neat.DefaultSpeciesSet, neat.DefaultStagnation,
                                 config_path)
-    p = neat.Population(config)
-    try:
-        with open('axiogen_stage2_AUTOSAVE.pkl', 'rb') as f:
-            stage2_genome = pickle.load(f)
-        new_pop = {}
-        for i in range(config.pop_size):
-            key = i + 1
-            g = copy.deepcopy(stage2_genome)
-            g.key = key
-            g.fitness = 0.0
-            g.mutate(config.genome_config)
-            new_pop[key] = g
-        p.population = new_pop
-        p.species.speciate(config, p.population, p.generation)
-        print(" >> Stage 2 Explorer DNA Injected.")
-    except:
-        print(" >> Starting Fresh.")
+    if options.resume:
+        p = checkpoint.restore(checkpoint_filename if options.resume == 'auto' else options.resume, config)
+        generation = p.generation
+        print(f" >> Resumed from checkpoint at generation {generation}.")
+    else:
+        try:
+            # 5 radar inputs map onto the first 5 of Stage 3's 10; key/goal senses start unconnected
+            stage2_genome = genomeio.load_brain('axiogen_stage2_AUTOSAVE', config) # .axg, else .pkl
+            p = transfer.seeded_population(config, stage2_genome)
+            print(" >> Stage 2 Explorer DNA Injected.")
+        except:
+            print(" >> Starting Fresh.")
+            p = neat.Population(config)
 
     p.add_reporter(neat.StdOutReporter(True))
-    p.run(eval_genomes, 150)
+    if options.checkpoint_every:
+        p.add_reporter(checkpoint.Checkpointer(p, checkpoint_filename, options.checkpoint_every))
+    if options.sensor_table: sensor_table(World()) # build/map once, before workers fork
+    generation_log.flush_seconds = options.log_flush
+    if options.log_frames and options.arena == 'shared':
+        frame_log = metrics.MetricsLog(f"axiogen_stage3_{timestamp}_frames.axm", flush_seconds=options.log_flush)
+    timing_log = None
+    if options.arena == 'independent':
+        arena_pool = parallel.ArenaPool(evaluate_alone, config, options.workers)
+    elif options.timings:
+        timer = profiling.PhaseTimer()
+        timing_log = metrics.MetricsLog(f"axiogen_stage3_{timestamp}_timings.axm", flush_seconds=0)
+        p.add_reporter(profiling.TimingReporter(timer, timing_log))
+    if options.memo and options.stop_cutoff:
+        print(" >> NOTICE: --memo is off with --stop-cutoff (whether an agent is cut depends on the others).")
+    elif options.memo:
+        fitness_cache = memo.FitnessCache(options.memo_size)
+        p.add_reporter(memo.CacheReporter(fitness_cache))
+    early_stop = earlystop.from_options(options, config, settle, gain_bounds)
+    if early_stop is not None: p.add_reporter(earlystop.EarlyStopReporter(early_stop))
+    stream = live.from_options(options, p, {'generation': generation_log, 'timings': timing_log}) # --live
+    fitness_function = eval_genomes
+    if options.profile_gen:
+        fitness_function = profiling.profile_generation(eval_genomes, options.profile_gen, p.generation + 1,
+                                                        "axiogen_stage3")
+    try:
+        p.run(fitness_function, 150 - p.generation)
+    finally:
+        if arena_pool is not None: arena_pool.close()
+        generation_log.close()
+        if frame_log is not None: frame_log.close()
+        if stream is not None: stream.close()
 
 if __name__ == "__main__":
+    args = runtime.build_parser("AXIOGEN Stage 3: The Architect").parse_args()
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, 'config-feedforward.txt')
-    run(config_path)
\ No newline at end of file
+    run(config_path, args)
\ No newline at end of file
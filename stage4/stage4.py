@@ -5,28 +5,43 @@ import neat
 import os
 import random
 import pickle
-import csv
 import datetime
 import copy
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from axiocore import runtime, parallel, sensortable, plastic, checkpoint, genomeio, transfer, metrics, profiling, earlystop, worlds, physics, live
+import numpy as np
+
 # --- PROJECT AXIOGEN: STAGE 4 (THE SENTINEL - PLASTICITY EDITION) ---
 
 generation = 0
+options = runtime.defaults() # command line switches (see axiocore/runtime.py)
+arena_pool = None # process pool for --arena independent
 timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+log_filename = f"axiogen_stage4_{timestamp}.csv"
 autosave_filename = f"axiogen_stage4_AUTOSAVE.pkl"
+brain_filename = f"axiogen_stage4_AUTOSAVE.axg" # same brain, compact format (axiocore/genomeio.py)
+checkpoint_filename = f"axiogen_stage4_CHECKPOINT.pkl.gz" # full population, see --resume
+
+# Buffered logs (axiocore/metrics.py): nothing is written before the first flush
+generation_log = metrics.MetricsLog(f"axiogen_stage4_{timestamp}.axm", csv_path=log_filename)
+frame_log = None # per-frame, per-agent telemetry (--log-frames)
+timer = profiling.NullTimer() # --timings swaps in a PhaseTimer
+early_stop = None # earlystop.EarlyStop with --stop-*
+
+WORLD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'world_keygate.xml')
 
 class World:
-    def __init__(self):
-        self.width, self.height = 800, 600
-        self.friction = 0.92
-        self.walls = [
-            pygame.Rect(0, 0, 800, 15), pygame.Rect(0, 585, 800, 15),
-            pygame.Rect(0, 0, 15, 600), pygame.Rect(785, 0, 15, 600),
-            pygame.Rect(390, 0, 20, 250), pygame.Rect(390, 350, 20, 250)
-        ]
-        self.gate_rect = pygame.Rect(390, 250, 20, 100)
-        self.switch_pos = (100, 100)
-        self.goal_pos = (700, 300)
+    def __init__(self, path=WORLD_FILE):
+        spec = worlds.load(path) # world_keygate.xml, parsed once and cached by content hash
+        self.width, self.height = spec.width, spec.height
+        self.friction = spec.friction
+        self.walls = spec.wall_rects() # borders and the wall splitting the screen at x=400
+        self.gate_rect = spec.gate_rect() # fills the gap in the divider
+        self.gated_walls = self.walls + [self.gate_rect] # what an agent without the key runs into
+        self.wall_set = spec.wall_set(with_gate=True) # for --engine numpy, built once per file
+        self.switch_pos = spec.switch # the key
+        self.goal_pos = spec.goal
 
 class Agent:
     def __init__(self, x, y, genome, config):
@@ -38,11 +53,12 @@ class Agent:
         self.has_key = False
         self.energy = 2000
         self.pain = 0 # Grounded Pain Sensor
+        self.wall_hits = 0
         
-        # NEAT Brain
+        # NEAT Brain: weights are edited in place during life, synced to the genome at the end
         self.genome = genome
         self.config = config
-        self.net = neat.nn.FeedForwardNetwork.create(genome, config)
+        self.net = plastic.PlasticNetwork(genome, config, options.plasticity, options.trace_decay)
 
     def move(self, world, outputs):
         if not self.alive: return
@@ -68,6 +84,7 @@ class Agent:
         else:
             self.vel = -2
             self.pain = 1.0 # FEEL THE PAIN (Groundedness)
+            self.wall_hits += 1
             # --- REAL-TIME PLASTICITY: PUNISH THE RECENT ACTION ---
             self.apply_plasticity(-0.1) # Weaken the connections that caused this crash
 
@@ -76,14 +93,9 @@ class Agent:
         if self.energy <= 0: self.alive = False
 
     def apply_plasticity(self, factor):
-        """ Manually nudges weights in the genome based on immediate experience """
-        for conn in self.genome.connections.values():
-            if conn.enabled:
-                # If we hit a wall, we nudge the weights slightly
-                # In a real brain, this would be restricted to recently active synapses
-                conn.weight += (random.random() * factor)
-        # Rebuild the network with new weights
-        self.net = neat.nn.FeedForwardNetwork.create(self.genome, self.config)
+        """ Nudges the live network's weights based on immediate experience (no rebuild) """
+        # --plasticity trace restricts the nudge to recently active synapses
+        self.net.apply_plasticity(factor)
 
     def sense(self, world):
         angles = [-45, -20, 0, 20, 45]
@@ -93,48 +105,157 @@ class Agent:
             start_pos = (self.x, self.y)
             end_pos = (self.x + math.cos(radar_angle)*150, self.y + math.sin(radar_angle)*150)
             closest_dist = 150
-            targets = world.walls + ([world.gate_rect] if not self.has_key else [])
+            targets = world.walls if self.has_key else world.gated_walls
             for wall in targets:
                 clipped = wall.clipline(start_pos, end_pos)
                 if clipped:
                     d = math.hypot(clipped[0][0]-self.x, clipped[0][1]-self.y)
                     if d < closest_dist: closest_dist = d
             self.radars.append(closest_dist)
-            
+        self.sense_targets(world)
+
+    def sense_targets(self, world):
         self.dist_s = math.hypot(world.switch_pos[0]-self.x, world.switch_pos[1]-self.y)
         self.ang_s = math.atan2(world.switch_pos[1]-self.y, world.switch_pos[0]-self.x) - math.radians(self.angle)
         self.dist_g = math.hypot(world.goal_pos[0]-self.x, world.goal_pos[1]-self.y)
         self.ang_g = math.atan2(world.goal_pos[1]-self.y, world.goal_pos[0]-self.x) - math.radians(self.angle)
 
+RADAR_ANGLES = np.array([-45, -20, 0, 20, 45])
+
+def sensor_table(world):
+    """ The precomputed radar table for this world (--sensor-table), built on first use. """
+    return sensortable.load(world.walls, world.gate_rect, world.width, world.height, 150, RADAR_ANGLES,
+                            cell=options.table_cell, step=options.table_step)
+
+def sense_all(world, agents):
+    """ Agent.sense for many agents at once: one ray cast (or table lookup) for every radar. """
+    x = [a.x for a in agents]
+    y = [a.y for a in agents]
+    if options.sensor_table:
+        readings = sensor_table(world).lookup(x, y, [a.angle for a in agents], [a.has_key for a in agents])
+    else:
+        angles = np.radians(np.array([a.angle for a in agents], dtype=float)[:, None] + RADAR_ANGLES)
+        # The gate (last wall) is only there for agents without the key
+        visible = np.ones((len(agents), len(world.gated_walls)), dtype=bool)
+        visible[:, -1] = [not a.has_key for a in agents]
+        readings = world.wall_set.cast(x, y, angles, 150, visible)
+    for agent, radars in zip(agents, readings.tolist()):
+        agent.radars = radars
+        agent.sense_targets(world)
+
+def move_all(world, agents, outputs):
+    """
+    Agent.move for many agents at once (axiocore/physics.py). Returns the
+    per-agent wall hits; the caller applies their plasticity, in agent order.
+    """
+    speed, turn = np.array([o[:2] for o in outputs], dtype=float).reshape(-1, 2).T
+    # The gate (last wall) is only solid for agents without the key
+    solid = np.ones((len(agents), len(world.gated_walls)), dtype=bool)
+    solid[:, -1] = [not a.has_key for a in agents]
+    x, y, angle, vel, hit = physics.step([a.x for a in agents], [a.y for a in agents], [a.angle for a in agents],
+                                         [a.vel for a in agents], speed, turn, world.wall_set, world.friction, 8,
+                                         rebound=-2, solid=solid)
+    hits = (hit >= 0).tolist()
+    for agent, ax, ay, aa, av, h in zip(agents, x.tolist(), y.tolist(), angle.tolist(), vel.tolist(), hits):
+        agent.x, agent.y, agent.angle, agent.vel = ax, ay, aa, av
+        agent.pain = 1.0 if h else 0
+        agent.wall_hits += h
+        agent.energy -= 1
+        if agent.energy <= 0: agent.alive = False
+    return hits
+
 def eval_genomes(genomes, config):
     global generation
     generation += 1
-    pygame.init()
-    world = World() 
-    screen = pygame.display.set_mode((world.width, world.height))
-    clock = pygame.time.Clock()
-    font = pygame.font.SysFont("Arial", 18)
+    if options.arena == 'independent':
+        results = arena_pool.evaluate(genomes, random.getrandbits(32), generation)
+        save_generation([genome for _, genome in genomes], sum(r.success for r in results), config)
+    else:
+        world = World() 
+        render = runtime.renders(options, generation)
+        ge, success_count = simulate(genomes, config, world, render)
+        save_generation(ge, success_count, config)
+        if render and options.render != 'all': pygame.display.quit() # no frozen window until the next sample
+    if runtime.replays_champion(options, generation): replay_champion(genomes, config)
+
+def replay_champion(genomes, config):
+    """
+    --render champion: the generation's best replayed alone on screen, on a
+    copy, off the training RNG and off the books: no timings, early stops or
+    frame telemetry are recorded for it.
+    """
+    champion = copy.deepcopy(max((genome for _, genome in genomes), key=lambda g: g.fitness))
+    with runtime.preserved_rng(), runtime.swapped(globals(), timer=profiling.NullTimer(), early_stop=None,
+                                                  frame_log=None):
+        simulate([(champion.key, champion)], config, World(), render=True)
+    pygame.display.quit()
+
+def evaluate_alone(genome, config, seed, gen):
+    """
+    Independent arena: one genome in its own world. Plasticity edits the genome
+    inside the worker, so the learned weights travel back with the fitness.
+    """
+    global generation
+    generation = gen
+    random.seed(seed)
+    born = {key: conn.weight for key, conn in genome.connections.items()}
+    _, success_count = simulate([(genome.key, genome)], config, World(), render=False)
+    # Only the weights plasticity actually changed go back to the parent
+    weights = {key: conn.weight for key, conn in genome.connections.items() if conn.weight != born[key]}
+    return parallel.Result(genome.fitness, False, success_count > 0, weights)
+
+def settle(agent, frame, hit_rate):
+    """ Early stop: the shaping reward at the agent's spot for the energy it has left (crashes cost no fitness). """
+    rate = (800 - agent.dist_g) / 100 if agent.has_key else (800 - agent.dist_s) / 500
+    return agent.energy * rate, agent.energy
+
+def gain_bounds(agent, frame):
+    """ Early stop: (worst, best) fitness change still possible with the energy left, at 8 px a frame at most. """
+    frames, reach = agent.energy, 8 * agent.energy
+    if agent.has_key:
+        return -2.0 * frames, 8.0 * frames + (20000 if agent.dist_g - 40 <= reach else 0)
+    return -2.0 * frames, 1.6 * frames + (25000 + 8.0 * frames if agent.dist_s - 40 <= reach else 0)
+
+def simulate(genomes, config, world, render):
+    """ One episode of the whole population. Returns (genomes, success count). """
+    if render:
+        pygame.init()
+        screen = pygame.display.set_mode((world.width, world.height))
+        clock = pygame.time.Clock()
+        font = pygame.font.SysFont("Arial", 18)
 
     agents = []
     for _, genome in genomes:
         genome.fitness = 0.0
         agents.append(Agent(100, 500, genome, config))
+    if early_stop is not None: early_stop.start(agents, [a.genome for a in agents])
 
+    # Sense the whole population in one call (batched ray cast or sensor table)
+    batched = options.engine == 'numpy' or options.sensor_table
+    success_count = 0
     running = True
+    frame = 0
     while running and any(a.alive for a in agents):
-        screen.fill((10, 10, 15))
-        for wall in world.walls: pygame.draw.rect(screen, (50, 50, 70), wall)
-        pygame.draw.rect(screen, (150, 0, 0), world.gate_rect)
-        pygame.draw.circle(screen, (0, 100, 255), world.switch_pos, 20) 
-        pygame.draw.circle(screen, (0, 255, 100), world.goal_pos, 25)   
+        timer.begin_frame()
+        if render:
+            screen.fill((10, 10, 15))
+            for wall in world.walls: pygame.draw.rect(screen, (50, 50, 70), wall)
+            pygame.draw.rect(screen, (150, 0, 0), world.gate_rect)
+            pygame.draw.circle(screen, (0, 100, 255), world.switch_pos, 20) 
+            pygame.draw.circle(screen, (0, 255, 100), world.goal_pos, 25)   
 
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: pygame.quit(); sys.exit()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT: pygame.quit(); sys.exit()
 
-        for agent in agents:
-            if not agent.alive: continue
-            
-            agent.sense(world)
+        timer.lap('render')
+        # Agents never interact, so batched sensing can run for everyone up front
+        if batched: sense_all(world, [a for a in agents if a.alive])
+        active = [agent for agent in agents if agent.alive]
+        active_agents = len(active)
+        outputs = []
+        for agent in active:
+            if not batched: agent.sense(world)
+            timer.lap('sense')
             # 12 INPUTS: 1-5 Radars, 6-7 Switch, 8-9 Goal, 10 Key, 11 PAIN, 12 ENERGY
             inputs = [
                 *[(150-x)/150 for x in agent.radars],
@@ -145,8 +266,14 @@ def eval_genomes(genomes, config):
                 agent.energy / 2000
             ]
             
-            output = agent.net.activate(inputs)
-            agent.move(world, output)
+            outputs.append(agent.net.activate(inputs))
+            timer.lap('activate')
+
+        hits = move_all(world, active, outputs) if options.engine == 'numpy' else None
+        for k, agent in enumerate(active):
+            if hits is None: agent.move(world, outputs[k])
+            elif hits[k]: agent.apply_plasticity(-0.1) # the crash move_all found, punished as Agent.move would
+            timer.lap('move')
             
             # --- GROUNDED REWARDS ---
             if not agent.has_key:
@@ -161,8 +288,17 @@ def eval_genomes(genomes, config):
                 if agent.dist_g < 40:
                     agent.genome.fitness += 20000
                     agent.alive = False
+                    success_count += 1
                     print("GOAL REACHED")
+            timer.lap('reward')
 
+        if early_stop is not None: early_stop.review(frame)
+        timer.end_frame(active_agents)
+        if frame_log is not None:
+            frame_log.record_many(metrics.agent_frame(generation, frame, [a.x for a in agents], [a.y for a in agents],
+                                                      [a.alive for a in agents], [a.genome.fitness for a in agents]))
+        frame += 1
+        if not render: continue
         # Draw Agents
         for agent in agents:
             if agent.alive:
@@ -172,38 +308,72 @@ def eval_genomes(genomes, config):
                 pygame.draw.circle(screen, color, (int(agent.x), int(agent.y)), 10)
         
         pygame.display.flip()
+        timer.lap('render')
         clock.tick(60)
+        timer.lap('tick')
+
+    for agent in agents: agent.net.sync() # learned weights go back into the genomes
+    return [a.genome for a in agents], success_count
 
+def save_generation(ge, success_count, config):
+    generation_log.record({"Generation": generation, "Max Fitness": max(g.fitness for g in ge),
+                           "Avg Fitness": sum(g.fitness for g in ge) / len(ge), "Success Count": success_count})
     # Auto-Save Best
-    best_genome = max((a.genome for a in agents), key=lambda g: g.fitness)
+    best_genome = max(ge, key=lambda g: g.fitness)
     with open(autosave_filename, 'wb') as f:
         pickle.dump(best_genome, f)
+    genomeio.save(brain_filename, best_genome, config)
 
-def run(config_path):
+def run(config_path, cli=None):
+    global options, arena_pool, generation, frame_log, timer, early_stop
+    if cli is not None: options = cli
+    runtime.seed_everything(options.seed)
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                                 neat.DefaultSpeciesSet, neat.DefaultStagnation,
                                 config_path)
-    p = neat.Population(config)
-    
-    # Load Stage 3 Logic
-    try:
-        with open('axiogen_stage3_AUTOSAVE.pkl', 'rb') as f:
-            stage3_genome = pickle.load(f)
-        print(" >> STAGE 3 Logic Injected.")
-        new_pop = {}
-        for i in range(config.pop_size):
-            key = i + 1
-            g = copy.deepcopy(stage3_genome)
-            g.key = key; g.fitness = 0.0
-            g.mutate(config.genome_config)
-            new_pop[key] = g
-        p.population = new_pop
-        p.species.speciate(config, p.population, p.generation)
-    except:
-        print(" >> Starting Fresh Stage 4.")
+    if options.resume:
+        p = checkpoint.restore(checkpoint_filename if options.resume == 'auto' else options.resume, config)
+        generation = p.generation
+        print(f" >> Resumed from checkpoint at generation {generation}.")
+    else:
+        # Load Stage 3 Logic (10 inputs onto the first 10 of 12; pain and energy start unconnected)
+        try:
+            stage3_genome = genomeio.load_brain('axiogen_stage3_AUTOSAVE', config) # .axg, else .pkl
+            p = transfer.seeded_population(config, stage3_genome)
+            print(" >> STAGE 3 Logic Injected.")
+        except:
+            print(" >> Starting Fresh Stage 4.")
+            p = neat.Population(config)
 
     p.add_reporter(neat.StdOutReporter(True))
-    p.run(eval_genomes, 100)
+    if options.checkpoint_every:
+        p.add_reporter(checkpoint.Checkpointer(p, checkpoint_filename, options.checkpoint_every))
+    if options.sensor_table: sensor_table(World()) # build/map once, before workers fork
+    generation_log.flush_seconds = options.log_flush
+    if options.log_frames and options.arena == 'shared':
+        frame_log = metrics.MetricsLog(f"axiogen_stage4_{timestamp}_frames.axm", flush_seconds=options.log_flush)
+    timing_log = None
+    if options.arena == 'independent':
+        arena_pool = parallel.ArenaPool(evaluate_alone, config, options.workers)
+    elif options.timings:
+        timer = profiling.PhaseTimer()
+        timing_log = metrics.MetricsLog(f"axiogen_stage4_{timestamp}_timings.axm", flush_seconds=0)
+        p.add_reporter(profiling.TimingReporter(timer, timing_log))
+    early_stop = earlystop.from_options(options, config, settle, gain_bounds)
+    if early_stop is not None: p.add_reporter(earlystop.EarlyStopReporter(early_stop))
+    stream = live.from_options(options, p, {'generation': generation_log, 'timings': timing_log}) # --live
+    fitness_function = eval_genomes
+    if options.profile_gen:
+        fitness_function = profiling.profile_generation(eval_genomes, options.profile_gen, p.generation + 1,
+                                                        "axiogen_stage4")
+    try:
+        p.run(fitness_function, 100 - p.generation)
+    finally:
+        if arena_pool is not None: arena_pool.close()
+        generation_log.close()
+        if frame_log is not None: frame_log.close()
+        if stream is not None: stream.close()
 
 if __name__ == "__main__":
-    run(os.path.join(os.path.dirname(__file__), 'config-feedforward.txt'))
\ No newline at end of file
+    args = runtime.build_parser("AXIOGEN Stage 4: The Sentinel").parse_args()
+    run(os.path.join(os.path.dirname(__file__), 'config-feedforward.txt'), args)
\ No newline at end of file